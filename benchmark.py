@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+from project import CashFlowTracker, export_data, group_uncategorized, read_csv
+
+
+# Category -> (share of rows, merchants, median amount); income categories have positive amounts
+CATEGORIES = {
+    "Groceries": (0.22, ["WALMART", "KROGER", "COSTCO WHSE", "TRADER JOE'S", "ALDI"], -65.00),
+    "Restaurants": (0.16, ["STARBUCKS", "MCDONALD'S", "CHIPOTLE", "DOORDASH", "UBER EATS"], -18.00),
+    "Transport": (0.12, ["SHELL OIL", "CHEVRON", "UBER TRIP", "LYFT RIDE", "METRO TRANSIT"], -35.00),
+    "Shopping": (0.12, ["AMAZON MKTP", "TARGET", "BEST BUY", "HOME DEPOT", "IKEA"], -55.00),
+    "Utilities": (0.05, ["CITY POWER", "WATER DEPT", "COMCAST", "VERIZON WIRELESS"], -90.00),
+    "Entertainment": (0.06, ["NETFLIX.COM", "SPOTIFY", "AMC THEATRES", "STEAM GAMES"], -15.00),
+    "Health": (0.04, ["CVS PHARMACY", "WALGREENS", "DENTAL CARE"], -40.00),
+    "Rent": (0.02, ["PROPERTY MGMT"], -1500.00),
+    "Salary": (0.03, ["PAYROLL ACME CORP"], 3200.00),
+    "Transfers": (0.18, ["ZELLE PAYMENT", "VENMO", "ATM WITHDRAWAL"], -60.00),
+}
+# Share of rows exported without a category, like a raw bank statement
+UNCATEGORIZED_SHARE = 0.4
+BENCHMARKS = ["read_csv", "import_csv", "filter", "summary", "target_report", "group_uncategorized", "dataframe", "export_data"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the main CashFlow Tracker operations on synthetic ledgers.")
+    parser.add_argument("--rows", nargs="+", default=["10k", "1M"], help="ledger sizes, e.g. 10k 1M 10M")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per operation, the fastest is kept")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against the results stored in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="slowdown over the baseline reported as a regression")
+    args = parser.parse_args()
+
+    results = run_benchmarks([parse_rows(rows) for rows in args.rows], args.repeat)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        table, regressions = compare(results, baseline, args.tolerance)
+        print(tabulate(table, headers=["Rows", "Operation", "Baseline (s)", "Current (s)", "Change"], tablefmt="grid"))
+        if regressions:
+            print(f"{len(regressions)} operations are more than {args.tolerance:.0%} slower than the baseline.")
+            sys.exit(1)
+    else:
+        table = [[rows, name, seconds] for rows, timings in results["timings"].items() for name, seconds in timings.items()]
+        print(tabulate(table, headers=["Rows", "Operation", "Seconds"], tablefmt="grid", floatfmt=".4f"))
+
+
+def parse_rows(rows):
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    rows = rows.strip().lower()
+    if rows[-1] in multipliers:
+        return int(float(rows[:-1]) * multipliers[rows[-1]])
+    return int(rows)
+
+
+def generate_ledger(path, rows, seed=0, chunk_size=1_000_000):
+    # Writes a CSV in the layout of sample.csv, in date order, about six transactions a day up to 20 years ending at 2024-12-31
+    rng = np.random.default_rng(seed)
+    names = list(CATEGORIES)
+    shares = np.array([CATEGORIES[name][0] for name in names])
+    shares /= shares.sum()
+    span = min(max(rows // 6, 1), 20 * 365)
+    first_day = np.datetime64("2024-12-31") - span
+
+    with open(path, "w", newline="") as file:
+        file.write("date,category,description,value\n")
+        for start in range(0, rows, chunk_size):
+            count = min(chunk_size, rows - start)
+            codes = rng.choice(len(names), size=count, p=shares)
+            days = first_day + np.sort(rng.integers(start * span // rows, (start + count) * span // rows + 1, size=count))
+            categorized = rng.random(count) >= UNCATEGORIZED_SHARE
+            # Merchant popularity falls off geometrically, and most descriptions carry a store number
+            merchant_ranks = np.floor(-np.log2(1 - rng.random(count))).astype(np.int64)
+            lines = []
+            for day, code, keep, rank, store_number, noise in zip(
+                np.datetime_as_string(days, unit="D").tolist(),
+                codes.tolist(),
+                categorized.tolist(),
+                merchant_ranks.tolist(),
+                rng.integers(1, 9999, size=count).tolist(),
+                rng.lognormal(0, 0.6, size=count).tolist(),
+            ):
+                name = names[code]
+                _, merchants, median = CATEGORIES[name]
+                merchant = merchants[min(rank, len(merchants) - 1)]
+                description = f"{merchant} #{store_number}" if store_number % 3 else merchant
+                lines.append(f"{day},{name if keep else ''},\"{description}\",{median * noise:.2f}\n")
+            file.write("".join(lines))
+
+
+def run_benchmarks(sizes, repeat=3):
+    results = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "timings": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            path = os.path.join(directory, f"ledger_{rows}.csv")
+            generate_ledger(path, rows)
+            results["timings"][str(rows)] = benchmark_ledger(path, directory, repeat)
+    return results
+
+
+def benchmark_ledger(path, directory, repeat):
+    tracker = CashFlowTracker()
+    tracker.import_csv(path)
+    tracker.set_target("Groceries", 400.00, "monthly")
+    tracker.set_target("Salary", 3000.00, "monthly")
+    start_date, end_date = tracker.date_span()
+    middle_date = start_date + (end_date - start_date) / 2
+
+    def consume_read_csv():
+        for _ in read_csv(path):
+            pass
+
+    def import_csv():
+        CashFlowTracker().import_csv(path)
+
+    def filter_view():
+        len(tracker.filter(date_tuple=(start_date, middle_date), category="Groceries", type="expense").transactions)
+
+    def dataframe():
+        # Drops the cached frames so the DataFrame is actually built
+        tracker.frames_version = None
+        tracker.dataframe()
+
+    def export():
+        # export_data writes to the working directory
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            os.remove(export_data(tracker, "export").split()[0])
+        finally:
+            os.chdir(cwd)
+
+    operations = {
+        "read_csv": consume_read_csv,
+        "import_csv": import_csv,
+        "filter": filter_view,
+        "summary": tracker.summary,
+        "target_report": tracker.target_report,
+        "group_uncategorized": lambda: group_uncategorized(tracker),
+        "dataframe": dataframe,
+        "export_data": export,
+    }
+    return {name: best_time(operations[name], repeat) for name in BENCHMARKS}
+
+
+def best_time(operation, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def compare(results, baseline, tolerance=0.25):
+    # Returns a row per operation timed in both runs, plus the rows that got slower than the tolerance allows
+    table = []
+    regressions = []
+    for rows, timings in results["timings"].items():
+        for name, seconds in timings.items():
+            previous = baseline.get("timings", {}).get(rows, {}).get(name)
+            if previous is None:
+                continue
+            change = seconds / previous - 1 if previous else 0.0
+            row = [rows, name, f"{previous:.4f}", f"{seconds:.4f}", f"{change:+.0%}"]
+            table.append(row)
+            if change > tolerance:
+                regressions.append(row)
+    return table, regressions
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,217 @@
+import cProfile
 import csv
+import glob
+import gzip
+import io
+import json
+import math
 import os
+import pstats
 import re
+import sqlite3
+import threading
+import time
+import tracemalloc
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, date
+from functools import lru_cache, wraps
+from itertools import repeat
 from dateutil.parser import parse
+import numpy as np
 import pandas as pd
 from tabulate import tabulate
-from typing import List, Dict, Tuple, Union
+from typing import Callable, List, Dict, Tuple, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class Instrumentation:
+    # Opt-in timing of the tracker's hot paths. Until a sink is added or a capture is requested,
+    # an instrumented call costs one extra function call and two attribute checks
+    CAPTURE_MODES = ["cprofile", "tracemalloc"]
+
+    def __init__(self):
+        self.sinks = []
+        self.capture = None
+        # pstats.Stats or tracemalloc.Snapshot of the last captured operation
+        self.captured = None
+
+
+    def add_sink(self, sink) -> None:
+        # A sink is any object with a record(event) method
+        self.sinks.append(sink)
+
+
+    def remove_sink(self, sink) -> None:
+        self.sinks.remove(sink)
+
+
+    def capture_next(self, mode: str) -> None:
+        # Profiles only the next instrumented operation
+        if mode not in self.CAPTURE_MODES:
+            raise ValueError("Invalid capture mode. Please choose 'cprofile' or 'tracemalloc'.")
+        self.capture = mode
+
+
+    def call(self, operation: str, function, args: tuple, kwargs: dict):
+        mode, self.capture = self.capture, None
+        event = {"operation": operation, "rows_scanned": count_rows(args[0]) if args else None}
+        state = self.start_capture(mode)
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+            # Lazy results are counted inside the timed section, so their deferred work is included
+            event["rows_returned"] = count_rows(result)
+        finally:
+            event["seconds"] = time.perf_counter() - start
+            self.stop_capture(mode, state, event)
+        event["time"] = time.time()
+        for sink in self.sinks:
+            sink.record(event)
+        return result
+
+
+    def call_generator(self, operation: str, function, args: tuple, kwargs: dict):
+        # The capture is claimed when the generator is created, so it profiles this operation and not the next one
+        mode, self.capture = self.capture, None
+        return self.generate(operation, mode, function, args, kwargs)
+
+
+    def generate(self, operation: str, mode: str, function, args: tuple, kwargs: dict):
+        # Generators are timed from the first row to the last, counting the rows they yield
+        event = {"operation": operation}
+        rows = 0
+        state = self.start_capture(mode)
+        start = time.perf_counter()
+        try:
+            for item in function(*args, **kwargs):
+                rows += 1
+                yield item
+        finally:
+            event["seconds"] = time.perf_counter() - start
+            self.stop_capture(mode, state, event)
+        event.update({"rows_scanned": rows, "rows_returned": rows, "time": time.time()})
+        for sink in self.sinks:
+            sink.record(event)
+
+
+    def start_capture(self, mode: str):
+        # Returns what stop_capture needs: the profiler, or whether tracing was started here and the memory traced before
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        if mode == "tracemalloc":
+            # Tracing the host process already started is left running; only its peak is reset
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+                return False, tracemalloc.get_traced_memory()[0]
+            tracemalloc.start()
+            return True, 0
+        return None
+
+
+    def stop_capture(self, mode: str, state, event: dict) -> None:
+        if mode == "cprofile":
+            state.disable()
+            self.captured = pstats.Stats(state)
+        elif mode == "tracemalloc":
+            started, baseline = state
+            self.captured = tracemalloc.take_snapshot()
+            event["peak_bytes"] = tracemalloc.get_traced_memory()[1] - baseline
+            if started:
+                tracemalloc.stop()
+
+
+instrumentation = Instrumentation()
+
+
+def instrumented(operation, generator=False):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.sinks and instrumentation.capture is None:
+                return function(*args, **kwargs)
+            if generator:
+                return instrumentation.call_generator(operation, function, args, kwargs)
+            return instrumentation.call(operation, function, args, kwargs)
+        return wrapper
+    return decorator
+
+
+def count_rows(value):
+    # Rows held by a tracker or a DataFrame, None for anything else
+    if isinstance(value, pd.DataFrame):
+        return len(value)
+    if hasattr(value, "transactions"):
+        return len(value.transactions)
+    return None
+
+
+class HistogramSink:
+    # Latencies of each operation in power-of-two microsecond buckets, with row counts
+    def __init__(self):
+        self.operations: Dict[str, Dict] = {}
+
+
+    def record(self, event: dict) -> None:
+        stats = self.operations.setdefault(event["operation"], {"count": 0, "seconds": 0.0, "max": 0.0, "rows": 0, "buckets": {}})
+        stats["count"] += 1
+        stats["seconds"] += event["seconds"]
+        stats["max"] = max(stats["max"], event["seconds"])
+        stats["rows"] += event["rows_scanned"] or 0
+        bucket = max(0, math.ceil(math.log2(max(event["seconds"] * 1e6, 1))))
+        stats["buckets"][bucket] = stats["buckets"].get(bucket, 0) + 1
+
+
+    def percentile(self, operation: str, fraction: float) -> float:
+        # Upper bound in seconds of the bucket holding the given fraction of the calls
+        stats = self.operations[operation]
+        seen = 0
+        for bucket in sorted(stats["buckets"]):
+            seen += stats["buckets"][bucket]
+            if seen >= fraction * stats["count"]:
+                return 2 ** bucket / 1e6
+        return stats["max"]
+
+
+    def __str__(self):
+        table = [
+            [operation, stats["count"], stats["seconds"] / stats["count"], self.percentile(operation, 0.5), self.percentile(operation, 0.99), stats["max"], stats["rows"]]
+            for operation, stats in self.operations.items()
+        ]
+        return tabulate(table, headers=["Operation", "Calls", "Mean (s)", "p50 (s)", "p99 (s)", "Max (s)", "Rows scanned"], tablefmt="grid", floatfmt=".6f")
+
+
+class JSONLinesSink:
+    # Appends one JSON object per instrumented call to a file
+    def __init__(self, path: str):
+        self.file = open(path, "a")
+
+
+    def record(self, event: dict) -> None:
+        self.file.write(json.dumps(event) + "\n")
+        self.file.flush()
+
+
+    def close(self) -> None:
+        self.file.close()
 
 
 class Transaction:
+    __slots__ = ("date", "category", "description", "value", "id", "type")
+
     def __init__(self, date: str, category: str, description: str, value: float):
         if isinstance(date, str):
             self.date = datetime.strptime(date, "%Y-%m-%d").date()
@@ -17,6 +220,8 @@ class Transaction:
         self.category = category
         self.description = description
         self.value = value
+        # Set by the store holding the transaction, so it can be found again on edit/delete
+        self.id = None
         if value > 0:
             self.type = "income"
         else:
@@ -28,6 +233,8 @@ class Transaction:
     
 
 class Budget:
+    __slots__ = ("category", "amount", "period")
+
     def __init__(self, category: str, amount: float, period: str):
         self.category = category
         self.amount = amount
@@ -39,6 +246,8 @@ class Budget:
     
 
 class Goal:
+    __slots__ = ("category", "amount", "period")
+
     def __init__(self, category: str, amount: float, period: str):
         self.category = category
         self.amount = amount
@@ -49,68 +258,1108 @@ class Goal:
         return f"Category: {self.category}, Amount: ${self.amount:.2f}, Period: {self.period}"
 
 
+class CategoryRule:
+    KINDS = ["keyword", "regex"]
+
+    def __init__(self, category: str, kind: str, pattern: str, min_value: float = None, max_value: float = None):
+        if kind not in self.KINDS:
+            raise ValueError("Invalid rule type. Please enter 'keyword' or 'regex'.")
+        if not pattern:
+            raise ValueError("Rule pattern can't be empty.")
+        if kind == "regex":
+            try:
+                re.compile(pattern)
+            except re.error:
+                raise ValueError("Invalid regular expression. Please enter a valid pattern.")
+        if min_value is not None and max_value is not None and min_value > max_value:
+            raise ValueError("Minimum value can't be greater than the maximum value.")
+        self.category = category.strip().lower().title()
+        self.kind = kind
+        self.pattern = pattern
+        self.min_value = min_value
+        self.max_value = max_value
+
+
+    def regex(self) -> str:
+        return re.escape(self.pattern) if self.kind == "keyword" else f"(?:{self.pattern})"
+
+
+    def __str__(self):
+        amounts = ""
+        if self.min_value is not None or self.max_value is not None:
+            low = "" if self.min_value is None else f"${self.min_value:.2f}"
+            high = "" if self.max_value is None else f"${self.max_value:.2f}"
+            amounts = f", Amount: {low} to {high}"
+        return f"Category: {self.category}, {self.kind.title()}: {self.pattern}{amounts}"
+
+
+class CategoryRules:
+    # Ordered categorization rules, the first rule matching a transaction wins
+    def __init__(self, rules: List[CategoryRule] = None):
+        self.rules = rules or []
+        # Combined patterns, or one pattern per rule, by the index of the first rule they cover
+        self.patterns: Dict[int, Union[re.Pattern, List[re.Pattern]]] = {}
+
+
+    def add(self, rule: CategoryRule) -> None:
+        self.rules.append(rule)
+        self.patterns.clear()
+
+
+    def pattern(self, start: int) -> Union[re.Pattern, List[re.Pattern]]:
+        # One lookahead per rule in priority order, each followed by an empty named group, so a single
+        # match tells which is the first rule whose pattern appears anywhere in the description
+        if start not in self.patterns:
+            rules = self.rules[start:]
+            flags = re.IGNORECASE | re.DOTALL
+            try:
+                # Groups of one rule would clash with another's once combined: names are redefined and
+                # numbered backreferences shift, so such rules are matched one at a time instead
+                if any(re.compile(rule.regex()).groups for rule in rules):
+                    raise re.error("Rules with groups can't be combined.")
+                branches = [f"(?=.*?{rule.regex()})(?P<r{index}>)" for index, rule in enumerate(rules, start)]
+                self.patterns[start] = re.compile("^(?:" + "|".join(branches) + ")", flags)
+            except re.error:
+                self.patterns[start] = [re.compile(rule.regex(), flags) for rule in rules]
+        return self.patterns[start]
+
+
+    def first_rule(self, start: int, description: str) -> int:
+        pattern = self.pattern(start)
+        if isinstance(pattern, list):
+            for index, rule_pattern in enumerate(pattern, start):
+                if rule_pattern.search(description):
+                    return index
+            return -1
+        match = pattern.match(description)
+        return int(match.lastgroup[1:]) if match else -1
+
+
+    def match(self, descriptions: np.ndarray, values: np.ndarray) -> np.ndarray:
+        # Index of the rule categorizing each row, -1 if none does. Each distinct description is matched once,
+        # and rows outside the amount range of their rule are retried against the rules after it
+        matched = np.full(len(values), -1, dtype=np.int64)
+        if not self.rules:
+            return matched
+        minimums = np.array([-np.inf if rule.min_value is None else rule.min_value for rule in self.rules])
+        maximums = np.array([np.inf if rule.max_value is None else rule.max_value for rule in self.rules])
+        pending = np.arange(len(values))
+        starts = np.zeros(len(values), dtype=np.int64)
+        while len(pending):
+            found = np.full(len(pending), -1, dtype=np.int64)
+            for start in np.unique(starts).tolist():
+                rows = np.flatnonzero(starts == start)
+                codes, uniques = pd.factorize(descriptions[pending[rows]], use_na_sentinel=False)
+                rules = [self.first_rule(start, str(description)) for description in uniques]
+                found[rows] = np.array(rules, dtype=np.int64)[codes]
+            hits = found >= 0
+            pending, found = pending[hits], found[hits]
+            amounts = values[pending]
+            fits = (amounts >= minimums[found]) & (amounts <= maximums[found])
+            matched[pending[fits]] = found[fits]
+            pending, starts = pending[~fits], found[~fits] + 1
+            remaining = starts < len(self.rules)
+            pending, starts = pending[remaining], starts[remaining]
+        return matched
+
+
+    def save(self, path: str = "category_rules.json") -> None:
+        rules = [[rule.category, rule.kind, rule.pattern, rule.min_value, rule.max_value] for rule in self.rules]
+        with open(path, "w") as file:
+            json.dump(rules, file, indent=2)
+
+
+    @classmethod
+    def load(cls, path: str = "category_rules.json") -> "CategoryRules":
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as file:
+            return cls([CategoryRule(*rule) for rule in json.load(file)])
+
+
+class DateParser:
+    # Parses the date column of one file, each distinct string only once
+    CACHE_LIMIT = 100_000
+
+    def __init__(self, date_format: str, sample: str):
+        self.date_format = date_format
+        self.format_string = date_format_string(date_format, sample)
+        self.cache: Dict[str, np.datetime64] = {}
+
+
+    def parse(self, date_strings: pd.Series) -> np.ndarray:
+        codes, uniques = pd.factorize(date_strings)
+        uniques = np.asarray(uniques, dtype=object).tolist()
+        missing = [date_str for date_str in uniques if date_str not in self.cache]
+        if missing:
+            if len(self.cache) + len(missing) > self.CACHE_LIMIT:
+                self.cache.clear()
+            self.cache.update(zip(missing, self.parse_unique(missing)))
+        parsed = np.array([self.cache[date_str] for date_str in uniques], dtype="datetime64[D]")
+        return parsed[codes]
+
+
+    def parse_unique(self, date_strings: List[str]) -> np.ndarray:
+        date_strings = np.array(date_strings, dtype=object)
+        # ISO dates are converted by NumPy directly. Its cast also accepts blanks, "NaT" and partial dates such as
+        # "2024-02", so it only runs when every string is a full YYYY-MM-DD date
+        if self.format_string == "%Y-%m-%d" and pd.Series(date_strings, dtype=object).str.fullmatch(ISO_DATE_PATTERN).all():
+            try:
+                return date_strings.astype("datetime64[D]")
+            except ValueError:
+                pass
+        parsed = pd.to_datetime(pd.Series(date_strings), format=self.format_string, errors="coerce").to_numpy().astype("datetime64[D]")
+        # Only the strings that don't follow the detected format go through dateutil
+        dayfirst = self.date_format == "dayfirst"
+        for index in np.flatnonzero(np.isnat(parsed)):
+            try:
+                parsed_date = parse(date_strings[index], dayfirst=dayfirst, default=datetime(2000, 1, 1))
+                # dateutil fills missing parts from the default, so a date that changes with it is incomplete
+                if parsed_date != parse(date_strings[index], dayfirst=dayfirst, default=datetime(2001, 2, 2)):
+                    raise ValueError("Incomplete date.")
+                parsed[index] = parsed_date
+            except (ValueError, OverflowError):
+                raise ValueError("'date' format should be one of the following: 'YYYY-MM-DD', 'MM-DD-YYYY', 'DD-MM-YYYY'")
+        return parsed
+
+
+class RunningTotals:
+    # Aggregates updated on every change to the rows, so summaries of a whole ledger never rescan it
+    def __init__(self):
+        self.income_counts: List[int] = []
+        self.expense_counts: List[int] = []
+        self.income_totals: List[float] = []
+        self.expense_totals: List[float] = []
+        # (month, category code) -> [rows, sum of absolute values], months numbered like datetime64[M]
+        self.months: Dict[Tuple[int, int], List[float]] = {}
+        # Day numbered like datetime64[D] -> rows
+        self.days: Dict[int, int] = {}
+        # Set while the containers are shared with another RunningTotals, which are copied before the first change
+        self.shared = False
+
+
+    def add_category(self) -> None:
+        self.own()
+        self.income_counts.append(0)
+        self.expense_counts.append(0)
+        self.income_totals.append(0.0)
+        self.expense_totals.append(0.0)
+
+
+    def update(self, day: np.datetime64, code: int, value: float, step: int) -> None:
+        # Totals are reset exactly once their last row is gone, so removals leave no rounding residue
+        self.own()
+        if value > 0:
+            self.income_counts[code] += step
+            self.income_totals[code] = self.income_totals[code] + step * value if self.income_counts[code] else 0.0
+        else:
+            self.expense_counts[code] += step
+            self.expense_totals[code] = self.expense_totals[code] + step * value if self.expense_counts[code] else 0.0
+
+        day = np.datetime64(day, "D")
+        key = (int(day.astype("datetime64[M]").astype(np.int64)), int(code))
+        bucket = self.months.setdefault(key, [0, 0.0])
+        bucket[0] += step
+        bucket[1] += step * abs(value)
+        if not bucket[0]:
+            del self.months[key]
+
+        day = int(day.astype(np.int64))
+        self.days[day] = self.days.get(day, 0) + step
+        if not self.days[day]:
+            del self.days[day]
+
+
+    def update_many(self, dates: np.ndarray, codes: np.ndarray, values: np.ndarray, step: int = 1) -> None:
+        self.own()
+        category_count = len(self.income_counts)
+        income = values > 0
+        income_counts = np.array(self.income_counts, dtype=np.int64) + step * np.bincount(codes[income], minlength=category_count)
+        expense_counts = np.array(self.expense_counts, dtype=np.int64) + step * np.bincount(codes[~income], minlength=category_count)
+        income_totals = np.array(self.income_totals) + step * np.bincount(codes[income], weights=values[income], minlength=category_count)
+        expense_totals = np.array(self.expense_totals) + step * np.bincount(codes[~income], weights=values[~income], minlength=category_count)
+        self.income_counts = income_counts.tolist()
+        self.expense_counts = expense_counts.tolist()
+        self.income_totals = np.where(income_counts > 0, income_totals, 0.0).tolist()
+        self.expense_totals = np.where(expense_counts > 0, expense_totals, 0.0).tolist()
+
+        frame = pd.DataFrame({
+            "month": dates.astype("datetime64[M]").astype(np.int64),
+            "code": codes,
+            "value": np.abs(values)
+        })
+        grouped = frame.groupby(["month", "code"], sort=False)["value"].agg(["count", "sum"])
+        for (month, code), count, total in zip(grouped.index.tolist(), grouped["count"].tolist(), grouped["sum"].tolist()):
+            bucket = self.months.setdefault((month, code), [0, 0.0])
+            bucket[0] += step * count
+            bucket[1] += step * total
+            if not bucket[0]:
+                del self.months[(month, code)]
+        for day, count in pd.Series(dates.astype(np.int64)).value_counts(sort=False).items():
+            self.days[day] = self.days.get(day, 0) + step * count
+            if not self.days[day]:
+                del self.days[day]
+
+
+    def own(self) -> None:
+        if self.shared:
+            self.income_counts = list(self.income_counts)
+            self.expense_counts = list(self.expense_counts)
+            self.income_totals = list(self.income_totals)
+            self.expense_totals = list(self.expense_totals)
+            self.months = {key: list(bucket) for key, bucket in self.months.items()}
+            self.days = dict(self.days)
+            self.shared = False
+
+
+    def share(self) -> "RunningTotals":
+        totals = RunningTotals()
+        totals.income_counts = self.income_counts
+        totals.expense_counts = self.expense_counts
+        totals.income_totals = self.income_totals
+        totals.expense_totals = self.expense_totals
+        totals.months = self.months
+        totals.days = self.days
+        totals.shared = self.shared = True
+        return totals
+
+
+    def date_span(self) -> Tuple[date, date]:
+        if not self.days:
+            raise ValueError("No transactions registered yet.")
+        return np.datetime64(min(self.days), "D").item(), np.datetime64(max(self.days), "D").item()
+
+
+    def month_matrix(self) -> Tuple[List[str], np.ndarray]:
+        months = sorted(set(month for month, _ in self.months))
+        month_index = {month: index for index, month in enumerate(months)}
+        totals = np.zeros((len(months), len(self.income_counts)))
+        for (month, code), (_, total) in self.months.items():
+            totals[month_index[month], code] = total
+        labels = [np.datetime64(month, "M").item().strftime("%B %Y") for month in months]
+        return labels, totals
+
+
+class PositionBuckets:
+    # Ascending row positions per bucket (a category code, or expense and income), kept up to date as rows change.
+    # Buffers only ever grow past their end or get replaced, so a copy can keep sharing them
+    def __init__(self, keys: np.ndarray, bucket_count: int):
+        order = np.argsort(keys, kind="stable")
+        offsets = np.zeros(bucket_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys, minlength=bucket_count), out=offsets[1:])
+        # Each buffer is exactly as long as its bucket, so the first append to it reallocates
+        self.buffers = [order[offsets[key]:offsets[key + 1]] for key in range(bucket_count)]
+        self.sizes = np.diff(offsets).tolist()
+
+
+    def share(self) -> "PositionBuckets":
+        buckets = PositionBuckets.__new__(PositionBuckets)
+        buckets.buffers = [buffer[:size] for buffer, size in zip(self.buffers, self.sizes)]
+        buckets.sizes = list(self.sizes)
+        return buckets
+
+
+    def positions(self, key: int) -> np.ndarray:
+        if key >= len(self.buffers):
+            return np.empty(0, dtype=np.int64)
+        return self.buffers[key][:self.sizes[key]]
+
+
+    def append(self, keys: np.ndarray, positions: np.ndarray) -> None:
+        # positions are past every position already held, so each bucket stays in order
+        if len(keys) == 1:
+            groups = [(int(keys[0]), positions)]
+        else:
+            order = np.argsort(keys, kind="stable")
+            keys, positions = keys[order], positions[order]
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            groups = zip(keys[starts].tolist(), np.split(positions, starts[1:]))
+        for key, group in groups:
+            while key >= len(self.buffers):
+                self.buffers.append(np.empty(0, dtype=np.int64))
+                self.sizes.append(0)
+            size, buffer = self.sizes[key], self.buffers[key]
+            needed = size + len(group)
+            if needed > len(buffer):
+                grown = np.empty(max(needed, 2 * len(buffer)), dtype=np.int64)
+                grown[:size] = buffer[:size]
+                self.buffers[key] = buffer = grown
+            buffer[size:needed] = group
+            self.sizes[key] = needed
+
+
+    def move(self, positions: np.ndarray, old_keys: np.ndarray, new_keys: np.ndarray) -> None:
+        # Rows changing bucket leave the old one and are merged into the new one, both rebuilt as new buffers
+        for key in np.unique(old_keys).tolist():
+            current = self.positions(key)
+            kept = current[~np.isin(current, positions[old_keys == key])]
+            self.buffers[key], self.sizes[key] = kept, len(kept)
+        for key in np.unique(new_keys).tolist():
+            merged = np.sort(np.concatenate([self.positions(key), positions[new_keys == key]]))
+            while key >= len(self.buffers):
+                self.buffers.append(np.empty(0, dtype=np.int64))
+                self.sizes.append(0)
+            self.buffers[key], self.sizes[key] = merged, len(merged)
+
+
+class TransactionStore:
+    # Columnar storage for transactions: one typed array per field, categories and descriptions dictionary-encoded
+    INITIAL_CAPACITY = 16
+    # Deleted rows are only tombstoned; the columns are compacted once this share of the slots is dead
+    COMPACT_FRACTION = 0.5
+
+    def __init__(self):
+        self.size = 0
+        self.dead = 0
+        self.next_id = 0
+        # Bumped on every change to the rows, so lazy views know when to re-evaluate
+        self.version = 0
+        self.categories: List[str] = []
+        self.category_codes: Dict[str, int] = {}
+        # Each distinct description is stored once; the code lookup is built on first use
+        self.description_names: List[str] = []
+        self.description_lookup: Dict[str, int] = None
+        # Set when description_names is shared with another store, which may keep appending to it; only the first
+        # description_count names are this store's, and the list is copied before this store adds one of its own
+        self.description_count: int = None
+        self.totals = RunningTotals()
+        self.dates = np.empty(self.INITIAL_CAPACITY, dtype="datetime64[D]")
+        self.codes = np.empty(self.INITIAL_CAPACITY, dtype=np.int32)
+        self.description_codes = np.empty(self.INITIAL_CAPACITY, dtype=np.int32)
+        self.values = np.empty(self.INITIAL_CAPACITY, dtype=np.float64)
+        self.ids = np.empty(self.INITIAL_CAPACITY, dtype=np.int64)
+        self.alive = np.empty(self.INITIAL_CAPACITY, dtype=bool)
+        # Set while the columns are buffers borrowed from a DataFrame, an Arrow table or another store, which are copied
+        # before the first write to an existing row; appends past the end never touch rows the lender can see
+        self.shared = False
+        # Slot of each transaction id (-1 once deleted), built on the first lookup by id
+        self.slot_of = None
+        # Positions ordered by date, grouped by category and grouped by type, each built on first use and dropped on
+        # compaction. The date index covers its first dates_indexed entries and grows as rows are appended in date
+        # order; the category and type buckets follow every append and recode
+        self.date_order = None
+        self.sorted_dates = None
+        self.dates_indexed = 0
+        self.category_index: PositionBuckets = None
+        self.type_index: PositionBuckets = None
+
+
+    @classmethod
+    def from_columns(cls, dates: np.ndarray, category_codes: np.ndarray, categories: List[str], description_codes: np.ndarray, descriptions: List[str], values: np.ndarray) -> "TransactionStore":
+        # Adopts already encoded columns without copying the ones whose dtype matches the store's
+        store = cls()
+        category_mapping = np.array([store.encode(category) for category in categories], dtype=np.int32)
+        description_mapping = np.array([store.encode_description(description) for description in descriptions], dtype=np.int32)
+        store.dates = np.asarray(dates, dtype="datetime64[D]")
+        store.codes = np.asarray(category_codes, dtype=np.int32)
+        store.description_codes = np.asarray(description_codes, dtype=np.int32)
+        # Dictionaries with repeated entries are merged, which means remapping the codes
+        if not np.array_equal(category_mapping, np.arange(len(category_mapping))):
+            store.codes = category_mapping[store.codes]
+        if not np.array_equal(description_mapping, np.arange(len(description_mapping))):
+            store.description_codes = description_mapping[store.description_codes]
+        store.values = np.asarray(values, dtype=np.float64)
+        store.size = len(store.values)
+        store.ids = np.arange(store.size, dtype=np.int64)
+        store.alive = np.ones(store.size, dtype=bool)
+        store.next_id = store.size
+        store.shared = True
+        store.totals.update_many(store.dates, store.codes, store.values)
+        return store
+
+
+    def own(self) -> None:
+        if self.shared:
+            for name in ("dates", "codes", "description_codes", "values", "ids", "alive"):
+                setattr(self, name, np.array(getattr(self, name)))
+            self.shared = False
+
+
+    def share(self) -> "TransactionStore":
+        # Copy-on-write copy: both stores read the same column buffers and running totals until either one changes them.
+        # The description list only grows, so it is shared by length; only the category dictionary is copied
+        self.compact()
+        store = TransactionStore()
+        store.size = self.size
+        store.next_id = self.next_id
+        store.version = self.version
+        store.categories = list(self.categories)
+        store.category_codes = dict(self.category_codes)
+        self.lend_descriptions(store)
+        store.totals = self.totals.share()
+        for name in ("dates", "codes", "description_codes", "values", "ids", "alive"):
+            setattr(store, name, getattr(self, name)[:self.size])
+        # The indexes are replaced or only grown past their end when rows change, so they can be shared too
+        store.sorted_dates, store.dates_indexed, store.date_order = self.sorted_dates, self.dates_indexed, self.date_order
+        store.category_index = self.category_index and self.category_index.share()
+        store.type_index = self.type_index and self.type_index.share()
+        store.shared = self.shared = True
+        return store
+
+
+    def __len__(self) -> int:
+        return self.size - self.dead
+
+
+    def encode(self, category: str) -> int:
+        code = self.category_codes.get(category)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(category)
+            self.category_codes[category] = code
+            self.totals.add_category()
+        return code
+
+
+    def encode_many(self, categories: np.ndarray) -> np.ndarray:
+        category_codes, unique_categories = pd.factorize(categories)
+        mapping = np.array([self.encode(category) for category in unique_categories], dtype=np.int32)
+        return mapping[category_codes] if len(categories) else np.empty(0, dtype=np.int32)
+
+
+    def descriptions(self) -> List[str]:
+        names = self.description_names
+        return names if self.description_count is None else names[:self.description_count]
+
+
+    def lend_descriptions(self, store: "TransactionStore") -> None:
+        store.description_names = self.description_names
+        store.description_count = len(self.description_names) if self.description_count is None else self.description_count
+
+
+    def own_descriptions(self) -> None:
+        if self.description_count is not None:
+            self.description_names = self.description_names[:self.description_count]
+            self.description_count = None
+
+
+    def encode_description(self, description: str) -> int:
+        if self.description_lookup is None:
+            self.description_lookup = {name: code for code, name in enumerate(self.descriptions())}
+        code = self.description_lookup.get(description)
+        if code is None:
+            self.own_descriptions()
+            code = len(self.description_names)
+            self.description_names.append(description)
+            self.description_lookup[description] = code
+        return code
+
+
+    def encode_descriptions(self, descriptions: np.ndarray) -> np.ndarray:
+        # Looks every distinct description up at once and adds the new ones in bulk
+        description_codes, unique_descriptions = pd.factorize(descriptions, use_na_sentinel=False)
+        if self.description_lookup is None:
+            self.description_lookup = {name: code for code, name in enumerate(self.descriptions())}
+        unique_descriptions = np.asarray(unique_descriptions, dtype=object)
+        mapping = np.array(list(map(self.description_lookup.get, unique_descriptions, repeat(-1, len(unique_descriptions)))), dtype=np.int32)
+        missing = np.flatnonzero(mapping < 0)
+        if len(missing):
+            self.own_descriptions()
+            first_code = len(self.description_names)
+            mapping[missing] = np.arange(first_code, first_code + len(missing))
+            new_descriptions = unique_descriptions[missing].tolist()
+            self.description_names.extend(new_descriptions)
+            self.description_lookup.update(zip(new_descriptions, range(first_code, first_code + len(missing))))
+        return mapping[description_codes] if len(descriptions) else np.empty(0, dtype=np.int32)
+
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self.date_order = None
+        self.category_index = None
+        self.type_index = None
+
+
+    def index_rows(self, start: int, end: int) -> None:
+        # Appended rows start:end join the category and type buckets, and extend the date index when they keep it
+        # in date order, as statements almost always do
+        self.version += 1
+        positions = np.arange(start, end)
+        if self.category_index is not None:
+            self.category_index.append(self.codes[start:end], positions)
+        if self.type_index is not None:
+            self.type_index.append((self.values[start:end] > 0).astype(np.int64), positions)
+        if self.date_order is None:
+            return
+        dates = self.dates[start:end]
+        count = self.dates_indexed
+        if (count and dates[0] < self.sorted_dates[count - 1]) or (dates[1:] < dates[:-1]).any():
+            self.date_order = None
+            return
+        needed = count + len(dates)
+        if needed > len(self.date_order):
+            # New buffers rather than a resize, so snapshots sharing the old ones keep them intact
+            capacity = max(needed, 2 * len(self.date_order))
+            date_order = np.empty(capacity, dtype=np.int64)
+            sorted_dates = np.empty(capacity, dtype="datetime64[D]")
+            date_order[:count] = self.date_order[:count]
+            sorted_dates[:count] = self.sorted_dates[:count]
+            self.date_order, self.sorted_dates = date_order, sorted_dates
+        self.date_order[count:needed] = positions
+        self.sorted_dates[count:needed] = dates
+        self.dates_indexed = needed
+
+
+    def reserve(self, count: int) -> None:
+        # Grows every column geometrically so appends stay amortized O(1)
+        needed = self.size + count
+        capacity = len(self.values)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        for name in ("dates", "codes", "description_codes", "values", "ids", "alive"):
+            old_column = getattr(self, name)
+            column = np.empty(capacity, dtype=old_column.dtype)
+            column[:self.size] = old_column[:self.size]
+            setattr(self, name, column)
+        self.shared = False
+
+
+    def append(self, date: date, category: str, description: str, value: float, id: int = None) -> int:
+        self.reserve(1)
+        position = self.size
+        code = self.encode(category)
+        if id is None:
+            id = self.next_id
+            self.next_id += 1
+        self.dates[position] = date
+        self.codes[position] = code
+        self.description_codes[position] = self.encode_description(description)
+        self.values[position] = value
+        self.ids[position] = id
+        self.alive[position] = True
+        self.size += 1
+        if self.slot_of is not None:
+            self.map_slots(position, self.size)
+        self.totals.update(date, code, value, 1)
+        self.index_rows(position, self.size)
+        return int(self.ids[position])
+
+
+    def extend(self, dates: np.ndarray, categories: np.ndarray, descriptions: np.ndarray, values: np.ndarray) -> np.ndarray:
+        # Appends a whole batch of rows column by column, returning their new ids
+        count = len(values)
+        self.reserve(count)
+        start, end = self.size, self.size + count
+        codes = self.encode_many(categories)
+        self.dates[start:end] = dates
+        self.codes[start:end] = codes
+        self.description_codes[start:end] = self.encode_descriptions(descriptions)
+        self.values[start:end] = values
+        self.ids[start:end] = np.arange(self.next_id, self.next_id + count)
+        self.alive[start:end] = True
+        self.next_id += count
+        self.size = end
+        if self.slot_of is not None:
+            self.map_slots(start, end)
+        self.totals.update_many(self.dates[start:end], codes, self.values[start:end])
+        self.index_rows(start, end)
+        return self.ids[start:end]
+
+
+    def map_slots(self, start: int, end: int) -> None:
+        # Records the slots of rows start:end in the id map, growing it for ids it has not seen yet
+        if len(self.slot_of) < self.next_id:
+            slot_of = np.full(max(self.next_id, 2 * len(self.slot_of)), -1, dtype=np.int64)
+            slot_of[:len(self.slot_of)] = self.slot_of
+            self.slot_of = slot_of
+        self.slot_of[self.ids[start:end]] = np.arange(start, end)
+
+
+    def slot(self, id: int) -> int:
+        if self.slot_of is None:
+            self.slot_of = np.full(self.next_id, -1, dtype=np.int64)
+            live = np.flatnonzero(self.alive[:self.size])
+            self.slot_of[self.ids[live]] = live
+        if not 0 <= id < len(self.slot_of):
+            return -1
+        return int(self.slot_of[id])
+
+
+    def remove(self, position: int) -> None:
+        # Tombstones the row in O(1); its slot is reclaimed by the next compaction
+        self.own()
+        self.totals.update(self.dates[position], self.codes[position], self.values[position], -1)
+        self.alive[position] = False
+        if self.slot_of is not None:
+            self.slot_of[self.ids[position]] = -1
+        self.dead += 1
+        self.version += 1
+        if self.dead > self.size * self.COMPACT_FRACTION:
+            self.compact()
+
+
+    def replace(self, position: int, date: date, category: str, description: str, value: float) -> int:
+        # The new row keeps the id of the one it replaces
+        id = int(self.ids[position])
+        self.remove(position)
+        return self.append(date, category, description, value, id)
+
+
+    def compact(self) -> None:
+        # Moves the live rows to the front of the columns, keeping their order
+        if not self.dead:
+            return
+        self.own()
+        live = np.flatnonzero(self.alive[:self.size])
+        count = len(live)
+        for name in ("dates", "codes", "description_codes", "values", "ids"):
+            column = getattr(self, name)
+            column[:count] = column[live]
+        self.alive[:count] = True
+        self.size = count
+        self.dead = 0
+        self.slot_of = None
+        self.invalidate()
+
+
+    def recode(self, position: int, category: str) -> None:
+        self.own()
+        code = self.encode(category)
+        day, value = self.dates[position], self.values[position]
+        self.totals.update(day, self.codes[position], value, -1)
+        self.totals.update(day, code, value, 1)
+        if self.category_index is not None:
+            self.category_index.move(np.array([position]), self.codes[position:position + 1], np.array([code]))
+        self.codes[position] = code
+        self.version += 1
+
+
+    def recode_many(self, positions: np.ndarray, categories: List[str]) -> None:
+        # Moves a batch of rows to new categories, one per row
+        self.own()
+        codes = self.encode_many(np.asarray(categories, dtype=object))
+        dates, values = self.dates[positions], self.values[positions]
+        self.totals.update_many(dates, self.codes[positions], values, -1)
+        self.totals.update_many(dates, codes, values, 1)
+        if self.category_index is not None:
+            self.category_index.move(positions, self.codes[positions], codes)
+        self.codes[positions] = codes
+        self.version += 1
+
+
+    def used_categories(self) -> List[str]:
+        return [
+            category for category, income, expense in zip(self.categories, self.totals.income_counts, self.totals.expense_counts)
+            if income or expense
+        ]
+
+
+    def category_positions(self, category: str) -> np.ndarray:
+        # Positions of one category's rows, in storage order
+        code = self.category_codes.get(category)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        if self.category_index is None:
+            self.category_index = PositionBuckets(self.codes[:self.size], len(self.categories))
+        return self.category_index.positions(code)
+
+
+    def type_positions(self, type: str) -> np.ndarray:
+        # Expense rows are bucket 0 of the type index, income rows bucket 1
+        if type not in ("expense", "income"):
+            return np.empty(0, dtype=np.int64)
+        if self.type_index is None:
+            self.type_index = PositionBuckets((self.values[:self.size] > 0).astype(np.int64), 2)
+        return self.type_index.positions(int(type == "income"))
+
+
+    def date_range(self, start_date: date, end_date: date) -> np.ndarray:
+        # Positions of rows dated within [start_date, end_date], found by bisecting the date index
+        date_order = self.date_order
+        if date_order is None:
+            # The order is published last, so a thread that sees it also sees the dates that go with it
+            date_order = np.argsort(self.dates[:self.size], kind="stable")
+            self.sorted_dates = self.dates[date_order]
+            self.dates_indexed = self.size
+            self.date_order = date_order
+        count = self.dates_indexed
+        sorted_dates = self.sorted_dates[:count]
+        low = np.searchsorted(sorted_dates, np.datetime64(start_date, "D"), side="left")
+        high = np.searchsorted(sorted_dates, np.datetime64(end_date, "D"), side="right")
+        return date_order[low:high]
+
+
+    def select(self, date_tuple: Tuple[date, date] = None, category: str = None, type: str = None, positions: np.ndarray = None) -> np.ndarray:
+        # None stands for every row, so each predicate only narrows the positions already selected
+        if date_tuple:
+            if positions is None:
+                positions = self.date_range(*date_tuple)
+            else:
+                dates = self.dates[positions]
+                start_date, end_date = (np.datetime64(d, "D") for d in date_tuple)
+                positions = positions[(dates >= start_date) & (dates <= end_date)]
+        if category:
+            if positions is None:
+                positions = self.category_positions(category)
+            else:
+                positions = positions[self.codes[positions] == self.category_codes.get(category, -1)]
+        if type:
+            if positions is None:
+                positions = self.type_positions(type)
+            else:
+                values = self.values[positions]
+                if type == "income":
+                    positions = positions[values > 0]
+                elif type == "expense":
+                    positions = positions[values <= 0]
+                else:
+                    positions = positions[:0]
+        if positions is None:
+            positions = np.arange(self.size)
+        return positions
+
+
+    def find(self, transaction: Transaction) -> int:
+        size = self.size
+        code = self.category_codes.get(transaction.category)
+        # Only looks the description up, so searching for a missing transaction never grows the dictionary
+        if self.description_lookup is None:
+            self.description_lookup = {name: code for code, name in enumerate(self.descriptions())}
+        description_code = self.description_lookup.get(transaction.description)
+        if code is None or description_code is None:
+            raise ValueError("Transaction not found.")
+        if transaction.id is not None:
+            # Ids are only unique within one store, so the row at the id's slot must also hold the transaction.
+            # A transaction from another tracker or session falls back to the search by value
+            position = self.slot(transaction.id)
+            if (
+                position >= 0
+                and self.dates[position] == np.datetime64(transaction.date, "D")
+                and self.codes[position] == code
+                and self.values[position] == transaction.value
+                and self.description_codes[position] == description_code
+            ):
+                return position
+        matches = np.flatnonzero(
+            self.alive[:size]
+            & (self.dates[:size] == np.datetime64(transaction.date, "D"))
+            & (self.codes[:size] == code)
+            & (self.values[:size] == transaction.value)
+            & (self.description_codes[:size] == description_code)
+        )
+        if len(matches) == 0:
+            raise ValueError("Transaction not found.")
+        return int(matches[0])
+
+
+    def take(self, positions: np.ndarray) -> "TransactionStore":
+        # Copies the selected rows into a new store that shares the category and description dictionary layout
+        store = TransactionStore()
+        for category in self.categories:
+            store.encode(category)
+        self.lend_descriptions(store)
+        store.next_id = self.next_id
+        store.size = len(positions)
+        store.dates = self.dates[positions]
+        store.codes = self.codes[positions]
+        store.description_codes = self.description_codes[positions]
+        store.values = self.values[positions]
+        store.ids = self.ids[positions]
+        store.alive = np.ones(store.size, dtype=bool)
+        store.totals.update_many(store.dates, store.codes, store.values)
+        return store
+
+
+    def category_column(self, positions=slice(None)) -> np.ndarray:
+        names = np.array(self.categories, dtype=object)
+        return names[self.codes[:self.size][positions]]
+
+
+    def description_column(self, positions=slice(None)) -> np.ndarray:
+        names = np.array(self.description_names, dtype=object)
+        return names[self.description_codes[:self.size][positions]]
+
+
+    def row(self, position: int) -> Transaction:
+        transaction = Transaction(
+            self.dates[position].item(),
+            self.categories[self.codes[position]],
+            self.description_names[self.description_codes[position]],
+            float(self.values[position]),
+        )
+        transaction.id = int(self.ids[position])
+        return transaction
+
+
+    def rows(self, positions=slice(None)) -> List[Transaction]:
+        # Materializes Transaction objects in bulk, converting each column once
+        dates = self.dates[:self.size][positions].astype(object)
+        categories = self.category_column(positions)
+        descriptions = self.description_column(positions)
+        values = self.values[:self.size][positions].tolist()
+        ids = self.ids[:self.size][positions].tolist()
+        transactions = []
+        for row in zip(dates, categories, descriptions, values, ids):
+            transaction = Transaction(*row[:4])
+            transaction.id = row[4]
+            transactions.append(transaction)
+        return transactions
+
+
+class TransactionList(Sequence):
+    # Read-only view of a store that only creates Transaction objects when they are accessed
+    CHUNK_SIZE = 4096
+
+    def __init__(self, store: TransactionStore, positions: np.ndarray = None):
+        self.store = store
+        # None means every row of the store, in storage order
+        self.positions = positions
+
+
+    def __len__(self) -> int:
+        if self.positions is None:
+            return len(self.store)
+        return len(self.positions)
+
+
+    def __getitem__(self, index):
+        positions = self.positions
+        if positions is None:
+            # Once compacted, the index of a row is its slot in the store
+            self.store.compact()
+            if isinstance(index, slice):
+                return self.store.rows(np.arange(*index.indices(len(self.store))))
+        elif isinstance(index, slice):
+            return self.store.rows(positions[index])
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("Transaction index out of range.")
+        return self.store.row(index if positions is None else positions[index])
+
+
+    def __iter__(self):
+        if self.positions is None:
+            self.store.compact()
+        for start in range(0, len(self), self.CHUNK_SIZE):
+            if self.positions is None:
+                yield from self.store.rows(slice(start, start + self.CHUNK_SIZE))
+            else:
+                yield from self.store.rows(self.positions[start:start + self.CHUNK_SIZE])
+
+
 class CashFlowTracker:
     TARGET_PERIODS = ["daily", "weekly", "monthly", "yearly"]
+    # Length of each period in days, and how many of each period fit in one report month
+    PERIOD_DAYS = {"daily": 1, "weekly": 7, "monthly": 30, "yearly": 365}
+    MONTHLY_SCALE = {"daily": 30, "weekly": 30 / 7, "monthly": 1, "yearly": 1 / 12}
 
     def __init__(self):
-        self.transactions: List[Transaction] = []
+        self.store = TransactionStore()
         self.budgets: Dict[str, Budget] = {}
         self.goals: Dict[str, Goal] = {}
+        # DataFrames built by dataframe(), dropped whenever the rows change
+        self.frames: Dict[bool, pd.DataFrame] = {}
+        self.frames_version = None
+
+
+    @property
+    def transactions(self) -> TransactionList:
+        if not self.filtered():
+            return TransactionList(self.store)
+        return TransactionList(self.store, self.selection())
+
+
+    def selection(self) -> Union[slice, np.ndarray]:
+        # Rows of the store that belong to this tracker
+        self.store.compact()
+        return slice(0, self.store.size)
+
 
+    def filtered(self) -> bool:
+        # Whether only some rows of the store belong to this tracker, so running totals do not apply
+        return False
 
-    def add(self, transaction: Transaction) -> List[Transaction]:
-        self.transactions.append(transaction)
+
+    def category_counts(self, category: str) -> Tuple[int, int]:
+        code = self.store.category_codes.get(category)
+        if code is None:
+            return 0, 0
+        return self.store.totals.income_counts[code], self.store.totals.expense_counts[code]
+
+
+    def add(self, transaction: Transaction) -> TransactionList:
+        transaction.id = self.store.append(transaction.date, transaction.category, transaction.description, transaction.value)
         return self.transactions
  
 
-    def edit(self, old_transaction: Transaction, new_transaction: Transaction) -> List[Transaction]:
-        self.delete(old_transaction)
-        self.add(new_transaction)
+    def extend(self, batch: pd.DataFrame) -> TransactionList:
+        # Adds a batch with the same columns as dataframe() without creating Transaction objects
+        self.store.extend(
+            batch["Date"].to_numpy().astype("datetime64[D]"),
+            batch["Category"].to_numpy(dtype=object),
+            batch["Description"].to_numpy(dtype=object),
+            batch["Value"].to_numpy(dtype=np.float64),
+        )
+        return self.transactions
+
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "CashFlowTracker":
+        # Takes the columns of dataframe(); float64 values and categorical columns are used without copying
+        def encoded(column):
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                codes, uniques = column.cat.codes.to_numpy(), column.cat.categories.tolist()
+                # Missing values have code -1 and become "", like an empty cell in a CSV file
+                if (codes < 0).any():
+                    codes = np.where(codes < 0, len(uniques), codes)
+                    uniques.append("")
+                return codes, uniques
+            codes, uniques = pd.factorize(column.to_numpy(dtype=object), use_na_sentinel=False)
+            return codes, uniques.tolist()
+
+        tracker = cls()
+        tracker.store = TransactionStore.from_columns(
+            df["Date"].to_numpy().astype("datetime64[D]"),
+            *encoded(df["Category"]),
+            *encoded(df["Description"]),
+            df["Value"].to_numpy(dtype=np.float64),
+        )
+        return tracker
+
+
+    @classmethod
+    def from_arrow(cls, table: "pa.Table") -> "CashFlowTracker":
+        # Dictionary-encoded text columns keep their indices, and numeric columns are read straight from the Arrow buffers
+        def encoded(column):
+            column = column.combine_chunks()
+            if pa.types.is_dictionary(column.type):
+                uniques = column.dictionary.to_pylist()
+                if column.indices.null_count:
+                    return column.indices.fill_null(len(uniques)).to_numpy(zero_copy_only=False), uniques + [""]
+                return column.indices.to_numpy(zero_copy_only=False), uniques
+            codes, uniques = pd.factorize(column.to_numpy(zero_copy_only=False), use_na_sentinel=False)
+            return codes, uniques.tolist()
+
+        dates = table.column("Date")
+        if pa.types.is_date32(dates.type):
+            dates = dates.cast(pa.int32()).to_numpy().astype("datetime64[D]")
+        else:
+            dates = np.asarray(dates.to_pandas(), dtype="datetime64[D]")
+        tracker = cls()
+        tracker.store = TransactionStore.from_columns(
+            dates,
+            *encoded(table.column("Category")),
+            *encoded(table.column("Description")),
+            table.column("Value").to_numpy(),
+        )
+        return tracker
+
+
+    def import_csv(self, path, date="date", category="category", description="description", value="value", batch_size=100_000) -> TransactionList:
+        for batch in read_csv_batches(path, date, category, description, value, batch_size):
+            self.extend(batch)
+        return self.transactions
+
+
+    def import_files(self, source, date="date", category="category", description="description", value="value", workers=None) -> Dict[str, str]:
+        # Parses every CSV of a directory, glob or list of paths in parallel; returns the error of each file that failed
+        paths = expand_paths(source)
+        errors = {}
+        if workers == 1 or len(paths) < 2:
+            frames = []
+            for path in paths:
+                try:
+                    frames.append(read_csv_frame(path, date, category, description, value))
+                except Exception as e:
+                    frames.append(e)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(read_csv_frame, path, date, category, description, value) for path in paths]
+                frames = []
+                for future in futures:
+                    try:
+                        frames.append(future.result())
+                    except Exception as e:
+                        frames.append(e)
+        # Files are merged in path order, whichever worker finished first
+        for path, frame in zip(paths, frames):
+            if isinstance(frame, Exception):
+                errors[path] = str(frame)
+            else:
+                self.extend(frame)
+        return errors
+
+
+    def edit(self, old_transaction: Transaction, new_transaction: Transaction) -> TransactionList:
+        position = self.store.find(old_transaction)
+        new_transaction.id = self.store.replace(position, new_transaction.date, new_transaction.category, new_transaction.description, new_transaction.value)
         return self.transactions
     
 
-    def delete(self, transaction: Transaction) -> List[Transaction]:
-        self.transactions.remove(transaction)
+    def delete(self, transaction: Transaction) -> TransactionList:
+        self.store.remove(self.store.find(transaction))
         return self.transactions
 
 
-    def categorize(self, transaction: Transaction, category: str) -> List[Transaction]:
-        transaction.category = category.strip().lower().title()
+    def categorize(self, transaction: Transaction, category: str) -> TransactionList:
+        position = self.store.find(transaction)
+        self.store.recode(position, category.strip().lower().title())
+        # The transaction shares the store's copy of the category name
+        transaction.category = self.store.categories[self.store.codes[position]]
         return self.transactions
 
 
-    def filter(self, date_tuple: Tuple[datetime, datetime] = None, category: str = None, type: str = None):
-        filtered_transactions = self.transactions
+    def apply_rules(self, rules: CategoryRules) -> int:
+        # Categorizes every uncategorized transaction some rule matches, returning how many were categorized
+        store = self.store
+        selection = self.selection()
+        positions = np.arange(store.size)[selection]
+        positions = positions[store.codes[positions] == store.category_codes.get("", -1)]
+        # Rows keep their description codes, so the rules never re-factorize the strings
+        descriptions = pd.Categorical.from_codes(store.description_codes[positions], store.descriptions())
+        matched = rules.match(descriptions, store.values[positions])
+        hits = matched >= 0
+        categories = [rule.category for rule in rules.rules]
+        store.recode_many(positions[hits], [categories[index] for index in matched[hits].tolist()])
+        return int(np.count_nonzero(hits))
+
+
+    def categories(self) -> set:
+        return set(self.store.used_categories())
+
+
+    @instrumented("filter")
+    def filter(self, date_tuple: Tuple[datetime, datetime] = None, category: str = None, type: str = None) -> "CashFlowView":
         if date_tuple:
             start_date, end_date = date_tuple
             if isinstance(start_date, str):
                 start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
             if isinstance(end_date, str):
                 end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-            filtered_transactions = [t for t in filtered_transactions if start_date <= t.date <= end_date]
-        if category:
-            filtered_transactions = [t for t in filtered_transactions if t.category == category]
-        if type:
-            filtered_transactions = [t for t in filtered_transactions if t.type == type]
-        
-        filtered_cashflow = CashFlowTracker()
-        for transaction in filtered_transactions:
-            filtered_cashflow.add(transaction)
+            date_tuple = (start_date, end_date)
+        return self.view([(date_tuple, category, type)])
+
+
+    def view(self, predicates: List[Tuple[Tuple[date, date], str, str]]) -> "CashFlowView":
+        return CashFlowView(self.store, predicates)
 
-        return filtered_cashflow
+
+    def snapshot(self) -> "CashFlowTracker":
+        # Independent copy of the rows and targets, for readers that must not see later changes.
+        # A whole ledger is shared copy-on-write; a filtered view copies the rows it selects
+        snapshot = CashFlowTracker()
+        if self.filtered():
+            snapshot.store = self.store.take(self.selection())
+        else:
+            snapshot.store = self.store.share()
+        snapshot.budgets = dict(self.budgets)
+        snapshot.goals = dict(self.goals)
+        return snapshot
 
 
     def set_target(self, category: str, amount: float, period: str) -> Union[Dict[str, Budget], Dict[str, Goal]]:
         if period not in self.TARGET_PERIODS:
             raise ValueError("Invalid period. Please enter a valid period.")
         
-        existing_categories = set([t.category for t in self.transactions])
-        if category not in existing_categories:
-            raise ValueError("Category not found. Please enter a valid category.")
-
         # Check if the category has transactions with positive or negative values
-        has_income = any(t.type == "income" for t in self.transactions if t.category == category)
-        has_expense = any(t.type == "expense" for t in self.transactions if t.category == category)
+        income_count, expense_count = self.category_counts(category)
+        has_income = income_count > 0
+        has_expense = expense_count > 0
+        if not has_income and not has_expense:
+            raise ValueError("Category not found. Please enter a valid category.")
 
         if has_income and not has_expense:
             goal = Goal(category, amount, period)
@@ -125,170 +1374,811 @@ class CashFlowTracker:
             raise ValueError("Category has both positive and negative transactions, please review category.")
         
 
+    def date_span(self) -> Tuple[date, date]:
+        if not self.filtered():
+            return self.store.totals.date_span()
+        dates = self.store.dates[self.selection()]
+        if not len(dates):
+            raise ValueError("No transactions registered yet.")
+        return dates.min().item(), dates.max().item()
+
+
+    def month_totals(self) -> Tuple[List[str], np.ndarray]:
+        # Month bucket index: absolute values summed per (month, category code), months in chronological order
+        store = self.store
+        if not self.filtered():
+            return store.totals.month_matrix()
+        selection = self.selection()
+        months = store.dates[selection].astype("datetime64[M]").astype(np.int64)
+        first_month = months.min()
+        buckets = months - first_month
+        bucket_count = int(buckets.max()) + 1
+        used = np.flatnonzero(np.bincount(buckets, minlength=bucket_count))
+        month_index = np.empty(bucket_count, dtype=np.int64)
+        month_index[used] = np.arange(len(used))
+
+        category_count = len(store.categories)
+        keys = month_index[buckets] * category_count + store.codes[selection]
+        totals = np.bincount(keys, weights=np.abs(store.values[selection]), minlength=len(used) * category_count)
+        labels = [np.datetime64(int(first_month + bucket), "M").item().strftime("%B %Y") for bucket in used]
+        return labels, totals.reshape(len(used), category_count)
+
+
+    @instrumented("target_report")
     def target_report(self) -> str:
         if not self.budgets and not self.goals:
             raise ValueError("No budgets or goals set yet.")
-        
-        start_date = min([t.date for t in self.transactions])
-        end_date = max([t.date for t in self.transactions])
-        report_period = end_date - start_date
-        report = []
-
-        if report_period.days < 30:
-            if self.goals:
-                for goal in self.goals.values():
-                    if goal.period == "daily":
-                        period_goal = goal.amount * report_period.days
-                    elif goal.period == "weekly":
-                        period_goal = goal.amount * (report_period.days / 7)
-                    elif goal.period == "monthly":
-                        period_goal = goal.amount * (report_period.days / 30)
-                    elif goal.period == "yearly":
-                        period_goal = goal.amount * (report_period.days / 365)
-                    actual = sum([abs(t.value) for t in self.transactions if t.category == goal.category])
-                    difference = period_goal - actual
-                    report.append({
-                        "Period": f"From {start_date} to {end_date}",
-                        "Category": goal.category,
-                        "Type": "Goal",
-                        "Goal": period_goal,
-                        "Actual": actual,
-                        "Difference": difference
-                    })
-                report_table = [[item["Category"], item["Type"], item["Amount"], item["Actual"], item["Difference"]] for item in report]
-
-            if self.budgets:
-                for budget in self.budgets.values():
-                    if budget.period == "daily":
-                        period_budget = budget.amount * report_period.days
-                    elif budget.period == "weekly":
-                        period_budget = budget.amount * (report_period.days / 7)
-                    elif budget.period == "monthly":
-                        period_budget = budget.amount * (report_period.days / 30)
-                    elif budget.period == "yearly":
-                        period_budget = budget.amount * (report_period.days / 365)
-                    actual = sum([abs(t.value) for t in self.transactions if t.category == budget.category])
-                    difference = period_budget - actual
-                    if not self.goals:
-                        report.append({
-                            "Period": f"From {start_date} to {end_date}"
-                        })
-                    report.append({
-                        "Category": budget.category,
-                        "Type": "Budget",
-                        "Amount": period_budget,
-                        "Actual": actual,
-                        "Difference": difference
-                    })
-                report_table = [[item["Category"], item["Type"], item["Amount"], item["Actual"], item["Difference"]] for item in report]
-
-            return tabulate(report_table, headers=["Category", "Type", "Amount", "Actual", "Difference"], tablefmt="grid", floatfmt=".2f")
-
-        else: 
-            grouped_transactions = group_by_month(self)
-            for month, transactions in grouped_transactions.items():
-                if self.goals:
-                    for goal in self.goals.values():
-                        if goal.period == "daily":
-                            period_goal = goal.amount * 30
-                        elif goal.period == "weekly":
-                            period_goal = goal.amount * (30 / 7)
-                        elif goal.period == "monthly":
-                            period_goal = goal.amount
-                        elif goal.period == "yearly":
-                            period_goal = goal.amount / 12
-                        actual = sum([abs(t.value) for t in transactions if t.category == goal.category])
-                        difference = period_goal - actual
-                        report.append({
-                            "Month": month,
-                            "Category": goal.category,
-                            "Type": "Goal",
-                            "Amount": period_goal,
-                            "Actual": actual,
-                            "Difference": difference
-                        })   
-                if self.budgets:
-                    for budget in self.budgets.values():
-                        if budget.period == "daily":
-                            period_budget = budget.amount * 30
-                        elif budget.period == "weekly":
-                            period_budget = budget.amount * (30 / 7)
-                        elif budget.period == "monthly":
-                            period_budget = budget.amount
-                        elif budget.period == "yearly":
-                            period_budget = budget.amount / 12
-                        actual = sum([abs(t.value) for t in transactions if t.category == budget.category])
-                        difference = period_budget - actual
-                        report.append({
-                            "Month": month,
-                            "Category": budget.category,
-                            "Type": "Budget",
-                            "Amount": period_budget,
-                            "Actual": actual,
-                            "Difference": difference
-                        })
-            report_table = [[item["Month"], item["Category"], item["Type"], item["Amount"], item["Actual"], item["Difference"]] for item in report]
-        
-            return tabulate(report_table, headers=["Month", "Category", "Type", "Amount", "Actual", "Difference"], tablefmt="grid", floatfmt=".2f")
+        start_date, end_date = self.date_span()
+        targets = list(self.goals.values()) + list(self.budgets.values())
+        month_labels, totals = self.month_totals()
+        # Targets on categories that no longer have transactions get a zero column
+        padded = np.concatenate([totals, np.zeros((len(month_labels), 1))], axis=1)
+        missing = len(self.store.categories)
+        columns = [self.store.category_codes.get(target.category, missing) for target in targets]
+
+        return target_report_table(start_date, end_date, month_labels, padded[:, columns], targets)
     
         
+    def summary_totals(self) -> Tuple[date, date, np.ndarray, np.ndarray]:
+        # Income and expense per category code plus the date span: kept running for a whole ledger, one grouped pass for a view
+        store = self.store
+        start_date, end_date = self.date_span()
+        if not self.filtered():
+            return start_date, end_date, np.array(store.totals.income_totals), np.array(store.totals.expense_totals)
+        selection = self.selection()
+        values = store.values[selection]
+        keys = store.codes[selection] * 2 + (values > 0)
+        sums = np.bincount(keys, weights=values, minlength=2 * len(store.categories)).reshape(-1, 2)
+        return start_date, end_date, sums[:, 1], sums[:, 0]
+
+
+    @instrumented("summary")
     def summary(self) -> str:
         # Calculates totals for incomes, expenses, and by category.
-        start_date = min([t.date for t in self.transactions])
-        end_date = max([t.date for t in self.transactions])
-        period = end_date - start_date
-        categories = set([t.category for t in self.transactions])
-        if categories == {""}:
-            total_income = sum([t.value for t in self.transactions if t.value > 0])
-            total_expense = sum([t.value for t in self.transactions if t.value < 0])
-            total_balance = total_income + total_expense
-            average_daily_income = total_income / period.days
-            average_daily_expense = total_expense / period.days
-        total_income = 0
-        total_expense = 0
-
-        for category in categories:
-            total_category_income = sum([t.value for t in self.transactions if t.category == category and t.value > 0])
-            total_category_expense = sum([t.value for t in self.transactions if t.category == category and t.value < 0])
-            total_income += total_category_income
-            total_expense += total_category_expense
-        
-        total_balance = total_income + total_expense
-        average_daily_income = total_income / period.days
-        average_daily_expense = total_expense / period.days
-
-        summary = {
-            "Period": f"From {start_date} to {end_date}",
-            "Duration": f"({period.days} days)",
-            "Average Daily Income": f"{average_daily_income:.2f}",
-            "Total Income": f"{total_income:.2f}",
-            "Average Daily Expense": f"{average_daily_expense:.2f}",
-            "Total Expense": f"{total_expense:.2f}",
-            "Total Balance": f"{total_balance:.2f}"
-        }
-
-        summary_table = [[key, value] for key, value in summary.items()]
-
-        return tabulate(summary_table, tablefmt="grid", floatfmt=".2f")
+        start_date, end_date, category_income, category_expense = self.summary_totals()
+        return summary_table(start_date, end_date, category_income.sum(), category_expense.sum())
  
 
+    def dataframe(self, derived: bool = False) -> pd.DataFrame:
+        # Built once per version of the rows; callers get a copy, so changes to it never reach the cache (a shallow copy
+        # would only protect it under pandas Copy-on-Write, which pandas 2 leaves off).
+        # derived adds the Month and Type of each transaction
+        store = self.store
+        selection = self.selection()
+        version = (store, store.version)
+        if self.frames_version != version:
+            self.frames = {}
+            self.frames_version = version
+        # Another reader of a shared snapshot may swap the cache dictionary, so this call keeps hold of its own
+        frames = self.frames
+        if derived not in frames:
+            data = {
+                "Date": store.dates[selection].astype(object),
+                "Category": store.category_column(selection),
+                "Description": store.description_column(selection),
+                "Value": store.values[selection].copy()
+            }
+            if derived:
+                values = data["Value"]
+                data["Month"] = store.dates[selection].astype("datetime64[M]")
+                data["Type"] = pd.Categorical.from_codes((values > 0).astype(np.int8), ["expense", "income"])
+            frames[derived] = pd.DataFrame(data)
+        return frames[derived].copy()
+
+
+    def to_arrow(self) -> "pa.Table":
+        # Categories and descriptions become dictionary columns over the store's codes, with no per-row strings
+        if pa is None:
+            raise ImportError("pyarrow is required to convert to and from Arrow tables.")
+        store = self.store
+        selection = self.selection()
+        return pa.table({
+            "Date": pa.array(store.dates[selection], type=pa.date32()),
+            "Category": pa.DictionaryArray.from_arrays(store.codes[selection], pa.array(store.categories, type=pa.string())),
+            "Description": pa.DictionaryArray.from_arrays(store.description_codes[selection], pa.array(store.descriptions(), type=pa.string())),
+            "Value": pa.array(store.values[selection]),
+        })
+
+
+    def __str__(self) -> str:
+        if not len(self.transactions):
+            return "No transactions registered yet."
+        df = self.dataframe()
+        df = df.sort_values("Date")
+        df["Value"] = df["Value"].map("{:.2f}".format)
+
+        return tabulate(df, headers="keys", tablefmt="grid", showindex=False, floatfmt=".2f")
+
+
+class CashFlowView(CashFlowTracker):
+    # Lazily filtered tracker: predicates are only evaluated against the shared store when rows are needed
+    def __init__(self, store: TransactionStore, predicates: List[Tuple[Tuple[date, date], str, str]]):
+        super().__init__()
+        self.store = store
+        self.predicates = predicates
+        self.positions = None
+        self.positions_version = None
+
+
+    def selection(self) -> Union[slice, np.ndarray]:
+        if not self.predicates:
+            return super().selection()
+        if self.positions is None or self.positions_version != self.store.version:
+            self.store.compact()
+            positions = None
+            for date_tuple, category, type in self.predicates:
+                positions = self.store.select(date_tuple, category, type, positions)
+            self.positions = positions
+            self.positions_version = self.store.version
+        return self.positions
+
+
+    def filtered(self) -> bool:
+        return bool(self.predicates)
+
+
+    def detach(self) -> None:
+        # Copies the selected rows into a store of its own, so changes no longer reach the source tracker
+        if self.predicates:
+            self.store = self.store.take(self.selection())
+            self.predicates = []
+            self.positions = None
+
+
+    def category_counts(self, category: str) -> Tuple[int, int]:
+        if not self.predicates:
+            return super().category_counts(category)
+        selection = self.selection()
+        matches = self.store.codes[selection] == self.store.category_codes.get(category, -1)
+        income = int(np.count_nonzero(self.store.values[selection][matches] > 0))
+        return income, int(np.count_nonzero(matches)) - income
+
+
+    def categories(self) -> set:
+        if not self.predicates:
+            return super().categories()
+        return set(self.store.categories[code] for code in np.unique(self.store.codes[self.selection()]))
+
+
+    def view(self, predicates: List[Tuple[Tuple[date, date], str, str]]) -> "CashFlowView":
+        # Chained filters compose their predicates instead of copying rows
+        return CashFlowView(self.store, self.predicates + predicates)
+
+
+    def add(self, transaction: Transaction) -> TransactionList:
+        self.detach()
+        return super().add(transaction)
+
+
+    def extend(self, batch: pd.DataFrame) -> TransactionList:
+        self.detach()
+        return super().extend(batch)
+
+
+    def edit(self, old_transaction: Transaction, new_transaction: Transaction) -> TransactionList:
+        self.detach()
+        return super().edit(old_transaction, new_transaction)
+
+
+    def delete(self, transaction: Transaction) -> TransactionList:
+        self.detach()
+        return super().delete(transaction)
+
+
+class CashFlowSummary:
+    # Summary and target report of CSV files folded batch by batch into running totals, without keeping any rows,
+    # so files larger than memory can be reported on
+    TARGET_PERIODS = CashFlowTracker.TARGET_PERIODS
+
+    def __init__(self):
+        # Only the category dictionary and the running totals of the store are used
+        self.store = TransactionStore()
+        self.budgets: Dict[str, Budget] = {}
+        self.goals: Dict[str, Goal] = {}
+
+
+    def extend(self, batch: pd.DataFrame) -> None:
+        codes = self.store.encode_many(batch["Category"].to_numpy(dtype=object))
+        self.store.totals.update_many(batch["Date"].to_numpy().astype("datetime64[D]"), codes, batch["Value"].to_numpy(dtype=np.float64))
+
+
+    def import_csv(self, path, date="date", category="category", description="description", value="value", batch_size=100_000) -> None:
+        for batch in read_csv_batches(path, date, category, description, value, batch_size):
+            self.extend(batch)
+
+
+    def date_span(self) -> Tuple[date, date]:
+        return self.store.totals.date_span()
+
+
+    def month_totals(self) -> Tuple[List[str], np.ndarray]:
+        return self.store.totals.month_matrix()
+
+
+    def summary_totals(self) -> Tuple[date, date, np.ndarray, np.ndarray]:
+        start_date, end_date = self.date_span()
+        return start_date, end_date, np.array(self.store.totals.income_totals), np.array(self.store.totals.expense_totals)
+
+
+    # The rest only reads the totals, so the tracker's own implementations apply unchanged
+    category_counts = CashFlowTracker.category_counts
+    categories = CashFlowTracker.categories
+    set_target = CashFlowTracker.set_target
+    target_report = CashFlowTracker.target_report
+    summary = CashFlowTracker.summary
+
+
+class ShardedCashFlowTracker:
+    # One CashFlowTracker per account or per year. Reports aggregate the shards in parallel and merge
+    # their partial totals by category name and month, so they match a single tracker holding every row
+    TARGET_PERIODS = CashFlowTracker.TARGET_PERIODS
+    SHARD_KEYS = ["account", "year"]
+
+    def __init__(self, shard_by: str = "account", workers: int = None, processes: bool = False):
+        if shard_by not in self.SHARD_KEYS:
+            raise ValueError("Invalid shard key. Please choose 'account' or 'year'.")
+        self.shard_by = shard_by
+        self.workers = workers
+        # Threads share the shards as they are; processes receive a pickled copy of each shard
+        self.processes = processes
+        self.shards: Dict[Union[str, int], CashFlowTracker] = {}
+        self.budgets: Dict[str, Budget] = {}
+        self.goals: Dict[str, Goal] = {}
+
+
+    def shard(self, key: Union[str, int]) -> CashFlowTracker:
+        if key not in self.shards:
+            self.shards[key] = CashFlowTracker()
+        return self.shards[key]
+
+
+    def shard_key(self, transaction_date: date, account: str) -> Union[str, int]:
+        if self.shard_by == "year":
+            return transaction_date.year
+        if account is None:
+            raise ValueError("Please enter the account of the transactions.")
+        return account
+
+
+    def add(self, transaction: Transaction, account: str = None) -> TransactionList:
+        return self.shard(self.shard_key(transaction.date, account)).add(transaction)
+
+
+    def extend(self, batch: pd.DataFrame, account: str = None) -> None:
+        if self.shard_by == "account":
+            self.shard(self.shard_key(None, account)).extend(batch)
+            return
+        years = batch["Date"].to_numpy().astype("datetime64[Y]").astype(np.int64) + 1970
+        for year in np.unique(years).tolist():
+            self.shard(year).extend(batch[years == year])
+
+
+    def import_csv(self, path, account=None, date="date", category="category", description="description", value="value", batch_size=100_000) -> None:
+        # Each account's statements can be imported on their own, in any order
+        for batch in read_csv_batches(path, date, category, description, value, batch_size):
+            self.extend(batch, account)
+
+
+    def map(self, function, trackers: list, processes: bool = None) -> list:
+        if processes is None:
+            processes = self.processes
+        if self.workers == 1 or len(trackers) < 2:
+            return [function(tracker) for tracker in trackers]
+        pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with pool(max_workers=self.workers) as executor:
+            return list(executor.map(function, trackers))
+
+
+    def filter(self, date_tuple: Tuple[datetime, datetime] = None, category: str = None, type: str = None) -> "ShardedCashFlowTracker":
+        sharded = ShardedCashFlowTracker(self.shard_by, self.workers, self.processes)
+        sharded.shards = {key: shard.filter(date_tuple, category, type) for key, shard in self.shards.items()}
+        # The views share their shard's store, so their predicates are evaluated on threads
+        self.map(CashFlowView.selection, list(sharded.shards.values()), processes=False)
+        return sharded
+
+
+    def partial_totals(self) -> List[dict]:
+        shards = [shard for shard in self.shards.values() if len(shard.transactions)]
+        if not shards:
+            raise ValueError("No transactions registered yet.")
+        return self.map(shard_totals, shards)
+
+
+    def merged_totals(self) -> Tuple[date, date, Dict[str, float], Dict[str, float], Dict[Tuple[str, str], float]]:
+        # Sums are merged with math.fsum, so the result does not depend on the order of the shards
+        partials = self.partial_totals()
+        start_date = min(partial["start_date"] for partial in partials)
+        end_date = max(partial["end_date"] for partial in partials)
+        merged = []
+        for name in ("income", "expense", "months"):
+            values = {}
+            for partial in partials:
+                for key, total in partial[name].items():
+                    values.setdefault(key, []).append(total)
+            merged.append({key: math.fsum(totals) for key, totals in values.items()})
+        return start_date, end_date, *merged
+
+
+    def category_counts(self, category: str) -> Tuple[int, int]:
+        counts = [shard.category_counts(category) for shard in self.shards.values()]
+        return sum(income for income, _ in counts), sum(expense for _, expense in counts)
+
+
+    def categories(self) -> set:
+        return set().union(*(shard.categories() for shard in self.shards.values()))
+
+
+    set_target = CashFlowTracker.set_target
+
+
+    @instrumented("summary")
+    def summary(self) -> str:
+        start_date, end_date, income, expense, _ = self.merged_totals()
+        return summary_table(start_date, end_date, math.fsum(income.values()), math.fsum(expense.values()))
+
+
+    @instrumented("target_report")
+    def target_report(self) -> str:
+        if not self.budgets and not self.goals:
+            raise ValueError("No budgets or goals set yet.")
+        start_date, end_date, _, _, months = self.merged_totals()
+        targets = list(self.goals.values()) + list(self.budgets.values())
+        month_labels = sorted(set(month for month, _ in months), key=lambda label: datetime.strptime(label, "%B %Y"))
+        actuals = np.array([[months.get((month, target.category), 0.0) for target in targets] for month in month_labels])
+        return target_report_table(start_date, end_date, month_labels, actuals, targets)
+
+
+class ReadWriteLock:
+    # Any number of readers or a single writer. Waiting writers go first, so a stream of readers cannot starve them
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writing = False
+        self.waiting_writers = 0
+
+
+    @contextmanager
+    def read(self):
+        with self.condition:
+            while self.writing or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                if not self.readers:
+                    self.condition.notify_all()
+
+
+    @contextmanager
+    def write(self):
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writing or self.readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writing = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+
+
+class ConcurrentCashFlowTracker:
+    # Thread-safe tracker. Writers queue their changes and apply them in batches under the write lock; each batch
+    # publishes one copy-on-write snapshot, and reports run on the latest snapshot without taking any lock
+    TARGET_PERIODS = CashFlowTracker.TARGET_PERIODS
+
+    def __init__(self, tracker: CashFlowTracker = None, batch_size: int = 1000):
+        self.tracker = tracker or CashFlowTracker()
+        self.batch_size = batch_size
+        self.lock = ReadWriteLock()
+        # Changes waiting for the next flush, as a method of the live tracker and its arguments
+        self.pending: List[Tuple[Callable, tuple]] = []
+        self.pending_lock = threading.Lock()
+        self.published = self.tracker.snapshot()
+
+
+    def snapshot(self) -> CashFlowTracker:
+        # Never changes once published, so any number of threads can read it at once
+        return self.published
+
+
+    @contextmanager
+    def read(self):
+        # The live tracker, including every flushed change, for readers that cannot work from a snapshot
+        with self.lock.read():
+            yield self.tracker
+
+
+    def write(self, function, *args):
+        # Runs a change against the live tracker together with the queued ones and publishes the result right away,
+        # for callers that need its return value
+        with self.lock.write():
+            try:
+                self.apply_pending()
+                return function(*args)
+            finally:
+                self.published = self.tracker.snapshot()
+
+
+    def apply_pending(self) -> None:
+        # A failing change does not hold back the rest of the batch; the first failure is raised once they are in
+        with self.pending_lock:
+            pending, self.pending = self.pending, []
+        error = None
+        for function, args in pending:
+            try:
+                function(*args)
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+
+
+    def flush(self) -> None:
+        with self.lock.write():
+            try:
+                self.apply_pending()
+            finally:
+                self.published = self.tracker.snapshot()
+
+
+    def queue(self, function, *args) -> None:
+        with self.pending_lock:
+            self.pending.append((function, args))
+            full = len(self.pending) >= self.batch_size
+        if full:
+            self.flush()
+
+
+    def add(self, transaction: Transaction) -> None:
+        # The transaction gets its id and becomes visible to readers once its batch is flushed
+        self.queue(self.tracker.add, transaction)
+
+
+    def extend(self, batch: pd.DataFrame) -> None:
+        self.queue(self.tracker.extend, batch)
+
+
+    def import_csv(self, path, date="date", category="category", description="description", value="value", batch_size=100_000) -> None:
+        # Readers keep the previous snapshot until the whole file is in
+        self.queue(self.tracker.import_csv, path, date, category, description, value, batch_size)
+
+
+    def edit(self, old_transaction: Transaction, new_transaction: Transaction) -> None:
+        self.queue(self.tracker.edit, old_transaction, new_transaction)
+
+
+    def delete(self, transaction: Transaction) -> None:
+        self.queue(self.tracker.delete, transaction)
+
+
+    def categorize(self, transaction: Transaction, category: str) -> None:
+        self.queue(self.tracker.categorize, transaction, category)
+
+
+    def apply_rules(self, rules: CategoryRules) -> None:
+        self.queue(self.tracker.apply_rules, rules)
+
+
+    def set_target(self, category: str, amount: float, period: str) -> None:
+        if period not in self.TARGET_PERIODS:
+            raise ValueError("Invalid period. Please enter a valid period.")
+        self.queue(self.tracker.set_target, category, amount, period)
+
+
+    @property
+    def transactions(self) -> TransactionList:
+        return self.published.transactions
+
+
+    def categories(self) -> set:
+        return self.published.categories()
+
+
+    def filter(self, date_tuple: Tuple[datetime, datetime] = None, category: str = None, type: str = None) -> "CashFlowView":
+        snapshot = self.published
+        view = snapshot.filter(date_tuple, category, type)
+        view.budgets, view.goals = snapshot.budgets, snapshot.goals
+        return view
+
+
+    def summary(self) -> str:
+        return self.published.summary()
+
+
+    def target_report(self) -> str:
+        return self.published.target_report()
+
+
+    def dataframe(self, derived: bool = False) -> pd.DataFrame:
+        return self.published.dataframe(derived)
+
+
+class SQLiteTransactionList(Sequence):
+    # Transactions of a SQLite ledger, fetched page by page instead of loaded at once
+    PAGE_SIZE = 4096
+
+    def __init__(self, tracker: "SQLiteCashFlowTracker"):
+        self.tracker = tracker
+
+
+    def __len__(self) -> int:
+        return self.tracker.query("SELECT COUNT(*) FROM transactions")[0][0]
+
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        rows = self.tracker.query("SELECT id, date, category, description, value FROM transactions", " ORDER BY id LIMIT 1 OFFSET ?", [index])
+        if index < 0 or not rows:
+            raise IndexError("Transaction index out of range.")
+        return self.tracker.row(rows[0])
+
+
+    def __iter__(self):
+        last_id = -1
+        while True:
+            rows = self.tracker.query("SELECT id, date, category, description, value FROM transactions", " ORDER BY id LIMIT ?", [self.PAGE_SIZE], [("id > ?", [last_id])])
+            if not rows:
+                return
+            for row in rows:
+                yield self.tracker.row(row)
+            last_id = rows[-1][0]
+
+
+class SQLiteCashFlowTracker:
+    # Same API as CashFlowTracker, backed by a SQLite file so the ledger survives restarts and can exceed RAM
+    TARGET_PERIODS = CashFlowTracker.TARGET_PERIODS
+
+    def __init__(self, path: str = ":memory:", connection: sqlite3.Connection = None, conditions: List[Tuple[str, list]] = None):
+        self.path = path
+        self.connection = connection or sqlite3.connect(path)
+        # Filters are kept as SQL conditions and pushed down into every query
+        self.conditions = conditions or []
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS transactions (id INTEGER PRIMARY KEY, date TEXT NOT NULL, category TEXT NOT NULL, description TEXT NOT NULL, value REAL NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS transactions_category ON transactions (category)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS targets (category TEXT PRIMARY KEY, type TEXT NOT NULL, amount REAL NOT NULL, period TEXT NOT NULL)")
+
+
+    def query(self, select: str, suffix: str = "", params: list = None, conditions: List[Tuple[str, list]] = None) -> list:
+        conditions = self.conditions + (conditions or [])
+        where = " WHERE " + " AND ".join(condition for condition, _ in conditions) if conditions else ""
+        where_params = [param for _, condition_params in conditions for param in condition_params]
+        return self.connection.execute(select + where + suffix, where_params + (params or [])).fetchall()
+
+
+    def row(self, row: tuple) -> Transaction:
+        transaction = Transaction(row[1], row[2], row[3], row[4])
+        transaction.id = row[0]
+        return transaction
+
+
+    @property
+    def transactions(self) -> SQLiteTransactionList:
+        return SQLiteTransactionList(self)
+
+
+    @property
+    def budgets(self) -> Dict[str, Budget]:
+        rows = self.connection.execute("SELECT category, amount, period FROM targets WHERE type = 'budget' ORDER BY rowid").fetchall()
+        return {category: Budget(category, amount, period) for category, amount, period in rows}
+
+
+    @property
+    def goals(self) -> Dict[str, Goal]:
+        rows = self.connection.execute("SELECT category, amount, period FROM targets WHERE type = 'goal' ORDER BY rowid").fetchall()
+        return {category: Goal(category, amount, period) for category, amount, period in rows}
+
+
+    def detach(self) -> None:
+        # Like CashFlowView.detach: copies the filtered rows and the targets into an in-memory database of its own,
+        # so added, edited and deleted rows no longer reach the source ledger. Ids are kept, so lookups still work
+        if not self.conditions:
+            return
+        rows = self.query("SELECT id, date, category, description, value FROM transactions", " ORDER BY id")
+        targets = self.connection.execute("SELECT category, type, amount, period FROM targets ORDER BY rowid").fetchall()
+        detached = SQLiteCashFlowTracker()
+        with detached.connection:
+            detached.connection.executemany("INSERT INTO transactions (id, date, category, description, value) VALUES (?, ?, ?, ?, ?)", rows)
+            detached.connection.executemany("INSERT INTO targets (category, type, amount, period) VALUES (?, ?, ?, ?)", targets)
+        self.path = detached.path
+        self.connection = detached.connection
+        self.conditions = []
+
+
+    def add(self, transaction: Transaction) -> SQLiteTransactionList:
+        self.detach()
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO transactions (date, category, description, value) VALUES (?, ?, ?, ?)",
+                (transaction.date.isoformat(), transaction.category, transaction.description, transaction.value)
+            )
+        transaction.id = cursor.lastrowid
+        return self.transactions
+
+
+    def import_csv(self, path, date="date", category="category", description="description", value="value", batch_size=100_000) -> SQLiteTransactionList:
+        self.detach()
+        with self.connection:
+            for batch in read_csv_batches(path, date, category, description, value, batch_size):
+                rows = zip(
+                    batch["Date"].to_numpy().astype("datetime64[D]").astype(str).tolist(),
+                    batch["Category"].tolist(),
+                    batch["Description"].tolist(),
+                    batch["Value"].tolist()
+                )
+                self.connection.executemany("INSERT INTO transactions (date, category, description, value) VALUES (?, ?, ?, ?)", rows)
+        return self.transactions
+
+
+    def find(self, transaction: Transaction) -> int:
+        values = (transaction.date.isoformat(), transaction.category, transaction.description, transaction.value)
+        rows = []
+        if transaction.id is not None:
+            # The id may come from another ledger, so the row must also hold the transaction's values
+            rows = self.connection.execute(
+                "SELECT id FROM transactions WHERE id = ? AND date = ? AND category = ? AND description = ? AND value = ?",
+                (transaction.id, *values)
+            ).fetchall()
+        if not rows:
+            rows = self.connection.execute(
+                "SELECT id FROM transactions WHERE date = ? AND category = ? AND description = ? AND value = ? ORDER BY id LIMIT 1",
+                values
+            ).fetchall()
+        if not rows:
+            raise ValueError("Transaction not found.")
+        return rows[0][0]
+
+
+    def edit(self, old_transaction: Transaction, new_transaction: Transaction) -> SQLiteTransactionList:
+        self.detach()
+        self.delete(old_transaction)
+        self.add(new_transaction)
+        return self.transactions
+
+
+    def delete(self, transaction: Transaction) -> SQLiteTransactionList:
+        self.detach()
+        with self.connection:
+            self.connection.execute("DELETE FROM transactions WHERE id = ?", (self.find(transaction),))
+        return self.transactions
+
+
+    def categorize(self, transaction: Transaction, category: str) -> SQLiteTransactionList:
+        # As with CashFlowView, categorizing a filtered row categorizes it in the source ledger too
+        row_id = self.find(transaction)
+        transaction.category = category.strip().lower().title()
+        with self.connection:
+            self.connection.execute("UPDATE transactions SET category = ? WHERE id = ?", (transaction.category, row_id))
+        return self.transactions
+
+
+    def apply_rules(self, rules: CategoryRules) -> int:
+        rows = self.query("SELECT id, description, value FROM transactions", conditions=[("category = ''", [])])
+        if not rows:
+            return 0
+        ids, descriptions, values = zip(*rows)
+        matched = rules.match(np.array(descriptions, dtype=object), np.array(values, dtype=np.float64))
+        updates = [(rules.rules[index].category, id) for id, index in zip(ids, matched.tolist()) if index >= 0]
+        with self.connection:
+            self.connection.executemany("UPDATE transactions SET category = ? WHERE id = ?", updates)
+        return len(updates)
+
+
+    def categories(self) -> set:
+        return set(category for category, in self.query("SELECT DISTINCT category FROM transactions"))
+
+
+    @instrumented("filter")
+    def filter(self, date_tuple: Tuple[datetime, datetime] = None, category: str = None, type: str = None) -> "SQLiteCashFlowTracker":
+        conditions = list(self.conditions)
+        if date_tuple:
+            start_date, end_date = date_tuple
+            if isinstance(start_date, str):
+                start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+            if isinstance(end_date, str):
+                end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+            conditions.append(("date BETWEEN ? AND ?", [start_date.isoformat(), end_date.isoformat()]))
+        if category:
+            conditions.append(("category = ?", [category]))
+        if type:
+            if type == "income":
+                conditions.append(("value > 0", []))
+            elif type == "expense":
+                conditions.append(("value <= 0", []))
+            else:
+                conditions.append(("0", []))
+        return SQLiteCashFlowTracker(self.path, self.connection, conditions)
+
+
+    def set_target(self, category: str, amount: float, period: str) -> Union[Dict[str, Budget], Dict[str, Goal]]:
+        if period not in self.TARGET_PERIODS:
+            raise ValueError("Invalid period. Please enter a valid period.")
+
+        # Check if the category has transactions with positive or negative values
+        rows = self.query("SELECT COALESCE(SUM(value > 0), 0), COALESCE(SUM(value <= 0), 0) FROM transactions", conditions=[("category = ?", [category])])
+        income_count, expense_count = rows[0]
+        if not income_count and not expense_count:
+            raise ValueError("Category not found. Please enter a valid category.")
+        if income_count and expense_count:
+            raise ValueError("Category has both positive and negative transactions, please review category.")
+
+        type = "goal" if income_count else "budget"
+        # Targets of a filtered ledger are its own, like those of a CashFlowView
+        self.detach()
+        with self.connection:
+            self.connection.execute("DELETE FROM targets WHERE category = ?", (category,))
+            self.connection.execute("INSERT INTO targets (category, type, amount, period) VALUES (?, ?, ?, ?)", (category, type, amount, period))
+        return self.goals if type == "goal" else self.budgets
+
+
+    def date_span(self) -> Tuple[date, date]:
+        start_date, end_date = self.query("SELECT MIN(date), MAX(date) FROM transactions")[0]
+        if start_date is None:
+            raise ValueError("No transactions registered yet.")
+        return date.fromisoformat(start_date), date.fromisoformat(end_date)
+
+
+    @instrumented("target_report")
+    def target_report(self) -> str:
+        goals = self.goals
+        budgets = self.budgets
+        if not budgets and not goals:
+            raise ValueError("No budgets or goals set yet.")
+        start_date, end_date = self.date_span()
+
+        targets = list(goals.values()) + list(budgets.values())
+        # Months with transactions, then the (month, category) sums for targeted categories
+        months = [month for month, in self.query("SELECT DISTINCT substr(date, 1, 7) AS month FROM transactions", " ORDER BY month")]
+        month_index = {month: index for index, month in enumerate(months)}
+        target_index = {}
+        for index, target in enumerate(targets):
+            target_index.setdefault(target.category, []).append(index)
+        placeholders = ", ".join("?" for _ in target_index)
+        rows = self.query(
+            "SELECT substr(date, 1, 7) AS month, category, SUM(ABS(value)) FROM transactions",
+            " GROUP BY month, category",
+            conditions=[(f"category IN ({placeholders})", list(target_index))]
+        )
+        actuals = np.zeros((len(months), len(targets)))
+        for month, category, total in rows:
+            actuals[month_index[month], target_index[category]] = total
+        month_labels = [datetime.strptime(month, "%Y-%m").strftime("%B %Y") for month in months]
+
+        return target_report_table(start_date, end_date, month_labels, actuals, targets)
+
+
+    @instrumented("summary")
+    def summary(self) -> str:
+        # Totals are aggregated inside SQLite, only one row comes back
+        start_date, end_date = self.date_span()
+        total_income, total_expense = self.query("SELECT SUM(CASE WHEN value > 0 THEN value ELSE 0 END), SUM(CASE WHEN value < 0 THEN value ELSE 0 END) FROM transactions")[0]
+        return summary_table(start_date, end_date, total_income, total_expense)
+
+
     def dataframe(self) -> pd.DataFrame:
-        data = {
-            "Date": [t.date for t in self.transactions],
-            "Category": [t.category for t in self.transactions],
-            "Description": [t.description for t in self.transactions],
-            "Value": [t.value for t in self.transactions]
-        }
-        df = pd.DataFrame(data)
+        rows = self.query("SELECT date, category, description, value FROM transactions", " ORDER BY id")
+        df = pd.DataFrame(rows, columns=["Date", "Category", "Description", "Value"])
+        df["Date"] = pd.to_datetime(df["Date"]).dt.date
         return df
 
 
     def __str__(self) -> str:
-        if not self.transactions:
+        if not len(self.transactions):
             return "No transactions registered yet."
         df = self.dataframe()
         df = df.sort_values("Date")
-        df["Value"] = df["Value"].apply(lambda x: f"{float(x):.2f}")
+        df["Value"] = df["Value"].map("{:.2f}".format)
 
         return tabulate(df, headers="keys", tablefmt="grid", showindex=False, floatfmt=".2f")
 
@@ -297,6 +2187,8 @@ def main():
     cashflowtracker = CashFlowTracker()
     filtered_cashflow = None
     data_choice = None
+    # Categorization rules are kept in a JSON file between sessions
+    rules = CategoryRules.load()
     print()
     print("Welcome to CashFlow Tracker!")
     try:
@@ -321,13 +2213,39 @@ def main():
             if main_choice == "1":
                 # Import transactions from CSV file
                 while True:
-                    path = input("Enter the path to the CSV file: ").strip()
+                    path = input("Enter the path to the CSV file (or a folder/pattern to import several files, or a .cft snapshot): ").strip()
+                    if path.rstrip("/").endswith(".cft"):
+                        try:
+                            snapshot = load_snapshot(path)
+                        except FileNotFoundError:
+                            print()
+                            print("Snapshot not found. Please enter a valid path.")
+                            continue
+                        if not cashflowtracker.transactions:
+                            cashflowtracker = snapshot
+                        else:
+                            cashflowtracker.extend(snapshot.dataframe())
+                            cashflowtracker.budgets.update(snapshot.budgets)
+                            cashflowtracker.goals.update(snapshot.goals)
+                        print()
+                        print("Snapshot has been loaded successfully.")
+                        break
+                    if os.path.isdir(path) or any(char in path for char in "*?["):
+                        paths = expand_paths(path)
+                        if not paths:
+                            print("No CSV files found. Please enter a valid folder or pattern.")
+                            continue
+                        errors = cashflowtracker.import_files(paths)
+                        print()
+                        print(f"{len(paths) - len(errors)} of {len(paths)} files have been imported successfully.")
+                        for failed_path, error in errors.items():
+                            print(f"Error in {failed_path}: {error}")
+                        break
                     if not path.endswith(".csv"):
                         print("Invalid file format. Please enter a valid CSV file.")
                         continue
                     try:
-                        for transaction in read_csv(path):
-                            cashflowtracker.add(transaction)
+                        cashflowtracker.import_csv(path)
                         print()
                         print("Transactions have been imported successfully.")
                         break
@@ -388,8 +2306,7 @@ def main():
                                     continue
 
                             try:
-                                for transaction in read_csv(path, date, category, description, value):
-                                    cashflowtracker.add(transaction)
+                                cashflowtracker.import_csv(path, date, category, description, value)
                                 print()
                                 print("Transactions have been imported successfully to your main CashFlow data.")
                             except ValueError as e:
@@ -416,7 +2333,7 @@ def main():
                         date = get_valid_date()
                         print()
                         print("Now the category.")
-                        categories = set([t.category for t in object.transactions])
+                        categories = object.categories()
                         category = get_category(categories)
                         print()
                         description = get_description()
@@ -473,7 +2390,7 @@ def main():
                                             date = get_valid_date()
                                             print()
                                             print("Now the category.")
-                                            categories = set([t.category for t in object.transactions])
+                                            categories = object.categories()
                                             category = get_category(categories)
                                             print()
                                             description = get_description()
@@ -497,7 +2414,7 @@ def main():
                             elif choice == "2":
                                 while True:
                                     print("Here is the list of the already existing categories:")
-                                    categories = set([t.category for t in object.transactions])
+                                    categories = object.categories()
                                     categories = list(categories)
                                     for index, category in categories:
                                         print(f"{index + 1}. {category}")
@@ -543,7 +2460,7 @@ def main():
                                         date = get_valid_date()
                                         print()
                                         print("Now the category.")
-                                        categories = set([t.category for t in object.transactions])
+                                        categories = object.categories()
                                         category = get_category(categories)
                                         print()
                                         description = get_description()
@@ -602,7 +2519,7 @@ def main():
                                         date = get_valid_date()
                                         print()
                                         print("Now the category.")
-                                        categories = set([t.category for t in object.transactions])
+                                        categories = object.categories()
                                         category = get_category(categories)
                                         print()
                                         description = get_description()
@@ -665,7 +2582,7 @@ def main():
                                         date = get_valid_date()
                                         print()
                                         print("Now the category.")
-                                        categories = set([t.category for t in object.transactions])
+                                        categories = object.categories()
                                         category = get_category(categories)
                                         print()
                                         description = get_description()
@@ -711,18 +2628,20 @@ def main():
                     print("Choose an option:")
                     print("1. If you want to categorize uncategorized transactions")
                     print("2. If you want to change a category already in use")
+                    print("3. If you want to categorize uncategorized transactions with your saved rules")
+                    print("4. If you want to add a categorization rule")
                     choice = input("Enter your choice: ").strip()
                     if choice == "1":
                         grouped_uncategorized = group_uncategorized(object)
                         for description, transactions in grouped_uncategorized.items():
                             print()
-                            print(f"Transactions with description: {description}")
+                            print(f"Transactions with descriptions like: {description}")
                             for transaction in transactions:
                                 print(transaction)
                             category = input("Enter the category for the above transactions: ").strip()
                             for transaction in transactions:
                                 object.categorize(transaction, category)
-                            print(f"All transactions with description '{description}' have been categorized as '{category}'.")
+                            print(f"All transactions with descriptions like '{description}' have been categorized as '{category}'.")
                         if data_choice == "1":
                             cashflowtracker = object
                         elif data_choice == "2":
@@ -757,6 +2676,50 @@ def main():
                                 cashflowtracker = object
                             data_choice = None
                             break
+                    elif choice == "3":
+                        if not rules.rules:
+                            print("No categorization rules saved yet.")
+                            continue
+                        print("Your rules, in the order they are applied:")
+                        for rule in rules.rules:
+                            print(rule)
+                        try:
+                            count = object.apply_rules(rules)
+                        except re.error as e:
+                            print(f"Error: invalid rule pattern ({e}).")
+                            continue
+                        print(f"{count} transactions have been categorized by your rules.")
+                        if data_choice == "1":
+                            cashflowtracker = object
+                        elif data_choice == "2":
+                            filtered_cashflow = object
+                        elif data_choice is None:
+                            cashflowtracker = object
+                        data_choice = None
+                        break
+
+                    elif choice == "4":
+                        category = input("Enter the category for the rule: ").strip()
+                        kind = input("Enter the rule type (keyword or regex): ").strip().lower()
+                        pattern = input("Enter the text or pattern to look for in the description: ").strip()
+                        try:
+                            min_value = input("Enter the minimum value, negative for expenses (leave blank for no minimum): ").strip()
+                            max_value = input("Enter the maximum value, negative for expenses (leave blank for no maximum): ").strip()
+                            rule = CategoryRule(
+                                category,
+                                kind,
+                                pattern,
+                                float(min_value) if min_value else None,
+                                float(max_value) if max_value else None
+                            )
+                        except ValueError as e:
+                            print(f"Error: {e}")
+                            continue
+                        rules.add(rule)
+                        rules.save()
+                        print(f"Rule saved: {rule}")
+                        continue
+
                     else:
                         print("Invalid choice, please check menu and choose the desired action.")
                         continue
@@ -809,7 +2772,7 @@ def main():
                         print()
                         category_bool = input("Do you want to filter by category (y/n)? ").strip().lower()
                         if category_bool == "y":
-                            categories = set([t.category for t in cashflowtracker.transactions])
+                            categories = cashflowtracker.categories()
                             categories = list(categories)
                             while True:
                                 list_bool = input("Do you want to see a list of the existing categories (y/n)?").strip().lower()
@@ -909,7 +2872,7 @@ def main():
                 if filtered_cashflow:
                     object, data_choice = choose_data_set(cashflowtracker, filtered_cashflow)
 
-                categories = set([t.category for t in object.transactions])
+                categories = object.categories()
                 if not object.transactions:
                     print()
                     print("There are no transactions registered yet.")
@@ -1086,17 +3049,19 @@ def main():
                     print("1. A complete table of the chosen data")
                     print("2. A target report of the chosen data")
                     print("3. A summary of the chosen data")
-                    print("4. Go back to the main menu")
+                    print("4. A binary snapshot of the chosen data (fast to reload)")
+                    print("5. Go back to the main menu")
                     print()
                     choice = input("Enter the number of your choice: ").strip()
                     if choice == "1":
                         while True:
                             try:
                                 name = input("Please choose a file name: ").strip()
-                                message = export_data(object, name)
+                                format = input("Please choose a format: csv, gzip, zstd or parquet (leave blank for csv): ").strip().lower() or "csv"
+                                message = export_data(object, name, format)
                                 print(f"{message}")
                                 break
-                            except ValueError as e:
+                            except (ImportError, ValueError) as e:
                                 print(f"Error: {e}")
                     elif choice == "2":
                         while True:
@@ -1117,6 +3082,15 @@ def main():
                             except ValueError as e:
                                 print(f"Error: {e}")
                     elif choice == "4":
+                        while True:
+                            try:
+                                name = input("Please choose a file name: ").strip()
+                                message = save_snapshot(object, name)
+                                print(f"{message}")
+                                break
+                            except ValueError as e:
+                                print(f"Error: {e}")
+                    elif choice == "5":
                         break
                     else:
                         print("Invalid choice, please check menu and choose the desired action.")
@@ -1147,26 +3121,34 @@ def main():
         exit(0)
 
 
+@instrumented("read_csv", generator=True)
 def read_csv(path, date="date", category="category", description="description", value="value"):
+    for batch in read_csv_batches(path, date, category, description, value):
+        dates = batch["Date"].to_numpy().astype("datetime64[D]").astype(object)
+        rows = zip(dates, batch["Category"].tolist(), batch["Description"].tolist(), batch["Value"].tolist())
+        for date_value, category_value, description_value, value_value in rows:
+            yield Transaction(date_value, category_value, description_value, value_value)
+
+
+def read_csv_batches(path, date="date", category="category", description="description", value="value", batch_size=100_000):
     # Setting defaut or custom values for the fields
     date_field = date.lower()
-    category_field = category.lower()
+    category_field = category.lower() if category else None
     description_field = description.lower()
     value_field = value.lower()
 
     with open(path, newline='') as file:
         reader = csv.reader(file)
-        header = next(reader)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("CSV file has no header.")
         header = [h.lower() for h in header]
         try:
             date_index = header.index(date_field)
         except ValueError:
             raise ValueError("'date' column not found in CSV file.")
-        
-        try:
-            category_index = header.index(category_field)
-        except ValueError:
-            category = ""
+
+        category_index = header.index(category_field) if category_field in header else None
 
         try:
             value_index = header.index(value_field)
@@ -1179,55 +3161,116 @@ def read_csv(path, date="date", category="category", description="description",
             raise ValueError("'description' column not found in CSV file.")
 
         date_list = []
-        for _ in range(30):
-            try:
-                date_value = next(reader)[date_index]
-                if not isinstance(date_value, str):
-                    date_value = date_value.strftime("%Y-%m-%d")
-                date_list.append(date_value)
-            except StopIteration:
-                break
-
-        date_format = check_date_format(date_list)
-
-        if date_format is None:
-            raise ValueError("'date' format couldn't be identified.")
-        
-        file.seek(0)
-        next(reader)
-
         for row in reader:
-            date_str = row[date_index]
-            try:
-                if date_format == "dayfirst":
-                    date = parse(date_str, dayfirst=True).strftime("%Y-%m-%d")
-                else:
-                    date = parse(date_str, dayfirst=False).strftime("%Y-%m-%d")
-            except ValueError:
-                raise ValueError("'date' format should be one of the following: 'YYYY-MM-DD', 'MM-DD-YYYY', 'DD-MM-YYYY'")
+            date_list.append(row[date_index])
+            if len(date_list) == 30:
+                break
 
-            if category != "":
-                category = row[category_index]
-            value = float(row[value_index])
-            description = row[description_index]
-            transaction = Transaction(date, category, description, value)
-            yield transaction
+    date_format = check_date_format(date_list)
+
+    if date_format is None:
+        raise ValueError("'date' format couldn't be identified.")
+
+    # The layout is detected once, so each batch is parsed with a single compiled parser
+    date_parser = DateParser(date_format, date_list[0])
+
+    columns = [date_index, description_index, value_index]
+    if category_index is not None:
+        columns.append(category_index)
+    chunks = pd.read_csv(
+        path,
+        header=None,
+        skiprows=1,
+        usecols=columns,
+        dtype={index: np.float64 if index == value_index else object for index in columns},
+        keep_default_na=False,
+        na_values={value_index: [""]},
+        chunksize=batch_size,
+    )
+    for chunk in chunks:
+        values = chunk[value_index].to_numpy(dtype=np.float64)
+        if np.isnan(values).any():
+            raise ValueError("'value' column must contain a number in every row.")
+        if category_index is None:
+            categories = np.full(len(chunk), "", dtype=object)
+        else:
+            categories = chunk[category_index].to_numpy(dtype=object)
+        # Text columns stay object arrays; letting pandas infer its string dtype would convert them there and back
+        yield pd.DataFrame({
+            "Date": date_parser.parse(chunk[date_index]),
+            "Category": pd.Series(categories, dtype=object, copy=False),
+            "Description": pd.Series(chunk[description_index].to_numpy(dtype=object), dtype=object, copy=False),
+            "Value": values,
+        })
+
+
+def read_csv_frame(path, date="date", category="category", description="description", value="value"):
+    return pd.concat(read_csv_batches(path, date, category, description, value), ignore_index=True)
+
+
+def expand_paths(source):
+    # Accepts a directory, a glob pattern or a list of paths and returns the CSV files in a stable order
+    if isinstance(source, (list, tuple)):
+        return list(source)
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, "*.csv")))
+    if any(char in source for char in "*?["):
+        return sorted(glob.glob(source))
+    return [source]
+
+
+def shard_totals(tracker):
+    # Partial aggregates of one shard, keyed by category name since every shard numbers its categories differently
+    start_date, end_date, income, expense = tracker.summary_totals()
+    month_labels, month_totals = tracker.month_totals()
+    names = tracker.store.categories
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "income": dict(zip(names, income.tolist())),
+        "expense": dict(zip(names, expense.tolist())),
+        "months": {
+            (month, names[code]): total
+            for month, totals in zip(month_labels, month_totals.tolist())
+            for code, total in enumerate(totals) if total
+        },
+    }
 
 
 def group_uncategorized(cashflowtracker):
     # Filter transactions that are uncategorized
     uncategorized = [t for t in cashflowtracker.transactions if t.category == ""]
     
-    # Group uncategorized transactions by description
+    # Group uncategorized transactions by normalized description, each group named after its first description
+    groups = {}
     grouped_uncategorized = {}
     for transaction in uncategorized:
-        if transaction.description not in grouped_uncategorized:
-            grouped_uncategorized[transaction.description] = []
-        grouped_uncategorized[transaction.description].append(transaction)
+        key = normalize_description(transaction.description)
+        if key not in groups:
+            groups[key] = []
+            grouped_uncategorized[transaction.description] = groups[key]
+        groups[key].append(transaction)
     
     return grouped_uncategorized
 
 
+# Dates NumPy can convert as they are; anything else takes the strict parser
+ISO_DATE_PATTERN = r"\d{4}-\d{2}-\d{2}"
+DATE_PATTERN = re.compile(r"\b\d{1,4}[/.-]\d{1,2}(?:[/.-]\d{2,4})?\b")
+STORE_NUMBER_PATTERN = re.compile(r"#\s*\w*|\b\d{3,}\b")
+SEPARATOR_PATTERN = re.compile(r"[\W_]+")
+
+
+@lru_cache(maxsize=100_000)
+def normalize_description(description: str) -> str:
+    # Drops dates, store numbers, punctuation and case, so "WALMART #123" and "Walmart #456" share a key.
+    # Bank descriptions repeat a lot, so most calls are answered by the cache
+    canonical = DATE_PATTERN.sub(" ", str(description).lower())
+    canonical = STORE_NUMBER_PATTERN.sub(" ", canonical)
+    canonical = SEPARATOR_PATTERN.sub(" ", canonical).strip()
+    return canonical or str(description).strip().lower()
+
+
 def group_by_month(object):
     # Group transactions by month
     transactions = object.transactions
@@ -1241,6 +3284,74 @@ def group_by_month(object):
     return grouped_transactions
 
 
+def summary_table(start_date, end_date, total_income, total_expense):
+    period = end_date - start_date
+    total_income = float(total_income)
+    total_expense = float(total_expense)
+    total_balance = total_income + total_expense
+    average_daily_income = total_income / period.days
+    average_daily_expense = total_expense / period.days
+
+    summary = {
+        "Period": f"From {start_date} to {end_date}",
+        "Duration": f"({period.days} days)",
+        "Average Daily Income": f"{average_daily_income:.2f}",
+        "Total Income": f"{total_income:.2f}",
+        "Average Daily Expense": f"{average_daily_expense:.2f}",
+        "Total Expense": f"{total_expense:.2f}",
+        "Total Balance": f"{total_balance:.2f}"
+    }
+
+    summary_table = [[key, value] for key, value in summary.items()]
+
+    return tabulate(summary_table, tablefmt="grid", floatfmt=".2f")
+
+
+def target_report_table(start_date, end_date, month_labels, actuals, targets):
+    # actuals has one row per month and one column per target (goals first, then budgets)
+    report_period = end_date - start_date
+    categories = [target.category for target in targets]
+    types = ["Goal" if isinstance(target, Goal) else "Budget" for target in targets]
+    amounts = np.array([target.amount for target in targets], dtype=np.float64)
+
+    if report_period.days < 30:
+        scale = np.array([report_period.days / CashFlowTracker.PERIOD_DAYS[target.period] for target in targets])
+        period_amounts = amounts * scale
+        actual = actuals.sum(axis=0)
+        difference = period_amounts - actual
+        report_table = [list(row) for row in zip(categories, types, period_amounts.tolist(), actual.tolist(), difference.tolist())]
+        return tabulate(report_table, headers=["Category", "Type", "Amount", "Actual", "Difference"], tablefmt="grid", floatfmt=".2f")
+
+    scale = np.array([CashFlowTracker.MONTHLY_SCALE[target.period] for target in targets])
+    period_amounts = (amounts * scale).tolist()
+    differences = (amounts * scale - actuals).tolist()
+    actuals = actuals.tolist()
+    report_table = []
+    for month_index, month in enumerate(month_labels):
+        for target_index in range(len(targets)):
+            report_table.append([
+                month,
+                categories[target_index],
+                types[target_index],
+                period_amounts[target_index],
+                actuals[month_index][target_index],
+                differences[month_index][target_index]
+            ])
+
+    return tabulate(report_table, headers=["Month", "Category", "Type", "Amount", "Actual", "Difference"], tablefmt="grid", floatfmt=".2f")
+
+
+def date_format_string(date_format, sample):
+    # Builds the strptime format for a layout returned by check_date_format, using the sample's separator
+    separator = "/" if "/" in sample else "-"
+    fields = {
+        "yearfirst": ["%Y", "%m", "%d"],
+        "monthfirst": ["%m", "%d", "%Y"],
+        "dayfirst": ["%d", "%m", "%Y"]
+    }
+    return separator.join(fields[date_format])
+
+
 def check_date_format(date_list):
     patterns = {
         "yearfirst": r"^\d{4}[-/](0[1-9]|1[012])[-/](0[1-9]|[12][0-9]|3[01])$",
@@ -1260,42 +3371,188 @@ def check_date_format(date_list):
         return None
 
 
-def export_data(data, name="cashflowtracker"):
-    if name.endswith(".csv"):
-        name = name.rstrip(".csv")
+EXPORT_FORMATS = {"csv": ".csv", "gzip": ".csv.gz", "zstd": ".csv.zst", "parquet": ".parquet"}
+
+
+@instrumented("export_data")
+def export_data(data, name="cashflowtracker", format="csv", chunk_size=500_000):
+    if format not in EXPORT_FORMATS:
+        raise ValueError("Invalid export format. Please choose csv, gzip, zstd or parquet.")
+    extension = ".txt" if isinstance(data, str) else EXPORT_FORMATS[format]
+    for suffix in sorted(EXPORT_FORMATS.values(), key=len, reverse=True):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
 
     if not re.match(r"^[a-zA-Z0-9][a-zA-Z0-9_\-()]*$", name):
         raise ValueError("Invalid file name. Please choose a name that contains only alphanumeric characters, underscores, or hyphens.")
 
+    if not isinstance(data, (str, CashFlowTracker, SQLiteCashFlowTracker, pd.DataFrame)):
+        raise ValueError("Invalid data type. Please enter a valid data type.")
+
     base_name = name
     counter = 1
-    while os.path.exists(f"{name}.csv"):
+    while os.path.exists(f"{name}{extension}"):
         name = f"{base_name}({counter})"
         counter += 1
+    path = f"{name}{extension}"
 
     if isinstance(data, str):
-        with open(f"{name}.txt", "w") as file:
+        with open(path, "w") as file:
             file.write(data)
-            
-        message = f"{name}.txt exported successfully."
-        return message
-
-    elif isinstance(data, CashFlowTracker):
-        df = data.dataframe()
-        df["Value"] = df["Value"].apply(lambda x: f"{x:.2f}")
-        df.to_csv(f"{name}.csv", index=False)
-    
-    elif isinstance(data, pd.DataFrame):
-        data["Value"] = data["Value"].apply(lambda x: f"{x:.2f}")
-        data.to_csv(f"{name}.csv", index=False)
+
+    elif format == "parquet":
+        if pa is None:
+            raise ImportError("pyarrow is required to export Parquet files.")
+        if isinstance(data, CashFlowTracker):
+            table = data.to_arrow()
+        else:
+            df = data.dataframe() if isinstance(data, SQLiteCashFlowTracker) else data
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, path)
 
     else:
+        with open_export(path, format) as file:
+            for text in export_text(data, chunk_size):
+                file.write(text)
+
+    message = f"{path} exported successfully."
+    return message
+
+
+def open_export(path, format):
+    # Text handle for the CSV output, compressing on the fly
+    if format == "gzip":
+        return gzip.open(path, "wt", newline="", compresslevel=6)
+    if format == "zstd":
+        if zstandard is None:
+            raise ImportError("zstandard is required to export zstd compressed files.")
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(open(path, "wb")), newline="")
+    return open(path, "w", newline="")
+
+
+def export_text(data, chunk_size):
+    # Yields the CSV text a chunk of rows at a time, so only one chunk is ever held in memory
+    if isinstance(data, CashFlowTracker):
+        # Every distinct category, description, date and value is formatted once; rows are only joined
+        store = data.store
+        positions = np.arange(store.size)[data.selection()]
+        categories = np.array([csv_field(category) for category in store.categories], dtype=object)
+        descriptions = np.array([csv_field(description) for description in store.descriptions()], dtype=object)
+        yield "Date,Category,Description,Value\n"
+        for start in range(0, len(positions), chunk_size):
+            chunk = positions[start:start + chunk_size]
+            date_codes, dates = pd.factorize(store.dates[chunk])
+            dates = np.datetime_as_string(np.asarray(dates, dtype="datetime64[D]"), unit="D").astype(object)
+            value_codes, values = pd.factorize(store.values[chunk])
+            values = np.array(["%.2f" % value for value in values.tolist()], dtype=object)
+            columns = (
+                dates[date_codes].tolist(),
+                categories[store.codes[chunk]].tolist(),
+                descriptions[store.description_codes[chunk]].tolist(),
+                values[value_codes].tolist(),
+            )
+            yield "".join([f"{day},{category},{description},{value}\n" for day, category, description, value in zip(*columns)])
+        return
+
+    df = data.dataframe() if isinstance(data, SQLiteCashFlowTracker) else data
+    for start in range(0, max(len(df), 1), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        # Whole-number values are written with two decimals like the rest
+        if "Value" in chunk and chunk["Value"].dtype.kind in "iu":
+            chunk = chunk.astype({"Value": np.float64})
+        yield chunk.to_csv(header=start == 0, index=False, float_format="%.2f", lineterminator="\n")
+
+
+def csv_field(text):
+    # Quotes a field the way csv.writer does by default
+    text = str(text)
+    if any(char in text for char in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def save_snapshot(data, name="cashflowtracker"):
+    # Writes the columns as .npy files plus a JSON file with the dictionaries, budgets and goals
+    if name.endswith(".cft"):
+        name = name[:-len(".cft")]
+
+    if not re.match(r"^[a-zA-Z0-9][a-zA-Z0-9_\-()]*$", name):
+        raise ValueError("Invalid file name. Please choose a name that contains only alphanumeric characters, underscores, or hyphens.")
+
+    if not isinstance(data, CashFlowTracker):
         raise ValueError("Invalid data type. Please enter a valid data type.")
-    
-    message = f"{name}.csv exported successfully."
+
+    base_name = name
+    counter = 1
+    while os.path.exists(f"{name}.cft"):
+        name = f"{base_name}({counter})"
+        counter += 1
+
+    selection = data.selection()
+    store = data.store if isinstance(selection, slice) else data.store.take(selection)
+
+    os.makedirs(f"{name}.cft")
+    np.save(f"{name}.cft/dates.npy", store.dates[:store.size])
+    np.save(f"{name}.cft/codes.npy", store.codes[:store.size])
+    np.save(f"{name}.cft/descriptions.npy", store.description_codes[:store.size])
+    np.save(f"{name}.cft/values.npy", store.values[:store.size])
+    np.save(f"{name}.cft/ids.npy", store.ids[:store.size])
+    metadata = {
+        "version": 1,
+        "next_id": store.next_id,
+        "categories": store.categories,
+        "income_counts": store.totals.income_counts,
+        "expense_counts": store.totals.expense_counts,
+        "income_totals": store.totals.income_totals,
+        "expense_totals": store.totals.expense_totals,
+        "months": [[month, code, count, total] for (month, code), (count, total) in store.totals.months.items()],
+        "days": list(store.totals.days.items()),
+        "descriptions": store.descriptions(),
+        "budgets": [[b.category, b.amount, b.period] for b in data.budgets.values()],
+        "goals": [[g.category, g.amount, g.period] for g in data.goals.values()]
+    }
+    with open(f"{name}.cft/metadata.json", "w") as file:
+        json.dump(metadata, file)
+
+    message = f"{name}.cft saved successfully."
     return message
 
 
+def load_snapshot(path):
+    # Columns are memory-mapped copy-on-write, so changes stay in memory and the snapshot is untouched
+    with open(os.path.join(path, "metadata.json")) as file:
+        metadata = json.load(file)
+
+    def column(name):
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="c")
+
+    cashflowtracker = CashFlowTracker()
+    store = cashflowtracker.store
+    store.dates = column("dates")
+    store.codes = column("codes")
+    store.values = column("values")
+    store.ids = column("ids")
+    store.description_codes = column("descriptions")
+    store.description_names = metadata["descriptions"]
+    store.size = len(store.values)
+    store.alive = np.ones(store.size, dtype=bool)
+    store.next_id = metadata["next_id"]
+    for category in metadata["categories"]:
+        store.encode(category)
+    store.totals.income_counts = metadata["income_counts"]
+    store.totals.expense_counts = metadata["expense_counts"]
+    store.totals.income_totals = metadata["income_totals"]
+    store.totals.expense_totals = metadata["expense_totals"]
+    store.totals.months = {(month, code): [count, total] for month, code, count, total in metadata["months"]}
+    store.totals.days = dict((day, count) for day, count in metadata["days"])
+    for category, amount, period in metadata["budgets"]:
+        cashflowtracker.budgets[category] = Budget(category, amount, period)
+    for category, amount, period in metadata["goals"]:
+        cashflowtracker.goals[category] = Goal(category, amount, period)
+    return cashflowtracker
+
+
 # UI functions
 def choose_data_set(cashflowtracker, filtered_cashflow):
     print("Please choose the dataset to use for this action:")
@@ -0,0 +1,241 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+from project import CashFlowTracker, Transaction, load_snapshot
+
+
+STATUS_TEXT = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+MAX_BODY_BYTES = 1_000_000
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class CashFlowService:
+    # HTTP/JSON API over a tracker. Writes run one at a time against the tracker and then publish a new
+    # snapshot; reads only ever see the latest published snapshot, so they never wait for a write to finish
+    def __init__(self, tracker: CashFlowTracker = None, host: str = "127.0.0.1", port: int = 8000, workers: int = None):
+        self.tracker = tracker or CashFlowTracker()
+        self.current = self.tracker.snapshot()
+        self.host = host
+        self.port = port
+        # Aggregations and imports run on these threads, keeping the event loop free for other clients
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.write_lock = None
+        self.server = None
+        self.routes = {
+            ("GET", "/transactions"): self.get_transactions,
+            ("GET", "/summary"): self.get_summary,
+            ("GET", "/target_report"): self.get_target_report,
+            ("POST", "/transactions"): self.post_transaction,
+            ("POST", "/import"): self.post_import,
+            ("POST", "/targets"): self.post_target,
+        }
+
+
+    async def start(self) -> None:
+        self.write_lock = asyncio.Lock()
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        # Port 0 asks the system for a free port
+        self.port = self.server.sockets[0].getsockname()[1]
+
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"CashFlow Tracker service listening on http://{self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+
+    async def run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+
+    async def write(self, function, *args):
+        # Applies a change to the tracker, then swaps in a snapshot that includes it
+        async with self.write_lock:
+            result = await self.run(function, *args)
+            self.current = await self.run(self.tracker.snapshot)
+        return result
+
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # One connection can carry several requests (HTTP/1.1 keep-alive)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                keep_alive = await self.respond(request_line, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+    async def respond(self, request_line: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if not line.strip():
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        keep_alive = headers.get("connection", "").lower() != "close"
+
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_BYTES:
+                keep_alive = False
+                raise HTTPError(413, "Request body is too large.")
+            body = await reader.readexactly(length) if length else b""
+            url = urlsplit(target)
+            route = self.routes.get((method, url.path))
+            if route is None:
+                allowed = any(path == url.path for _, path in self.routes)
+                raise HTTPError(405 if allowed else 404, "Method not allowed." if allowed else "Not found.")
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            payload = json.loads(body) if body else {}
+            if not isinstance(payload, dict):
+                raise HTTPError(400, "Request body must be a JSON object.")
+            status, response = await route(query, payload)
+        except HTTPError as e:
+            status, response = e.status, {"error": str(e)}
+        except (ValueError, TypeError, KeyError) as e:
+            status, response = 400, {"error": str(e)}
+        except Exception as e:
+            # Any other failure still gets a response, so the client is never left with a dropped connection
+            status, response = 500, {"error": f"{type(e).__name__}: {e}"}
+
+        content = json.dumps(response).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(content)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + content
+        )
+        return keep_alive
+
+
+    def filtered(self, query: dict) -> CashFlowTracker:
+        # The published snapshot, narrowed by the optional start, end, category and type query parameters
+        snapshot = self.current
+        if not any(key in query for key in ("start", "end", "category", "type")):
+            return snapshot
+        date_tuple = None
+        if "start" in query or "end" in query:
+            date_tuple = (query.get("start", "0001-01-01"), query.get("end", "9999-12-31"))
+        view = snapshot.filter(date_tuple=date_tuple, category=query.get("category"), type=query.get("type"))
+        view.budgets, view.goals = snapshot.budgets, snapshot.goals
+        return view
+
+
+    async def get_transactions(self, query: dict, payload: dict):
+        def transactions():
+            data = self.filtered(query)
+            transactions = data.transactions
+            rows = transactions[offset:offset + limit]
+            return {"count": len(transactions), "transactions": [transaction_json(t) for t in rows]}
+
+        offset, limit = int(query.get("offset", 0)), int(query.get("limit", 100))
+        if offset < 0 or limit < 0:
+            raise HTTPError(400, "offset and limit must not be negative.")
+        return 200, await self.run(transactions)
+
+
+    async def get_summary(self, query: dict, payload: dict):
+        return 200, {"summary": await self.run(lambda: self.filtered(query).summary())}
+
+
+    async def get_target_report(self, query: dict, payload: dict):
+        return 200, {"target_report": await self.run(lambda: self.filtered(query).target_report())}
+
+
+    async def post_transaction(self, query: dict, payload: dict):
+        transaction = Transaction(
+            datetime.strptime(payload["date"], "%Y-%m-%d").date(),
+            payload.get("category", "").strip().lower().title(),
+            payload["description"],
+            float(payload["value"]),
+        )
+        await self.write(self.tracker.add, transaction)
+        return 201, transaction_json(transaction)
+
+
+    async def post_import(self, query: dict, payload: dict):
+        fields = {field: payload[field] for field in ("date", "category", "description", "value") if field in payload}
+
+        def import_csv():
+            before = len(self.tracker.transactions)
+            self.tracker.import_csv(payload["path"], **fields)
+            return len(self.tracker.transactions) - before
+
+        try:
+            imported = await self.write(import_csv)
+        except FileNotFoundError:
+            raise HTTPError(400, "File not found. Please enter a valid path.")
+        except OSError as e:
+            raise HTTPError(400, f"Could not read the file: {e.strerror or e}.")
+        return 200, {"imported": imported}
+
+
+    async def post_target(self, query: dict, payload: dict):
+        await self.write(self.tracker.set_target, payload["category"], float(payload["amount"]), payload["period"])
+        return 201, {"category": payload["category"], "amount": float(payload["amount"]), "period": payload["period"]}
+
+
+def transaction_json(transaction: Transaction) -> dict:
+    return {
+        "id": transaction.id,
+        "date": transaction.date.isoformat(),
+        "category": transaction.category,
+        "description": transaction.description,
+        "value": transaction.value,
+        "type": transaction.type,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a CashFlow Tracker ledger as a JSON API on localhost.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--load", help="CSV file or .cft snapshot to start from")
+    args = parser.parse_args()
+
+    tracker = CashFlowTracker()
+    if args.load and args.load.endswith(".cft"):
+        tracker = load_snapshot(args.load)
+    elif args.load:
+        tracker.import_csv(args.load)
+    try:
+        asyncio.run(CashFlowService(tracker, args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
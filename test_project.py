@@ -1,9 +1,16 @@
 import pytest
-from datetime import datetime
-from project import CashFlowTracker, Transaction, check_date_format, export_data, group_uncategorized, group_by_month, read_csv
+from datetime import date, datetime
+from project import ConcurrentCashFlowTracker, HistogramSink, ShardedCashFlowTracker, JSONLinesSink, instrumentation, CashFlowSummary, CashFlowTracker, CategoryRule, CategoryRules, DateParser, Transaction, check_date_format, export_data, group_uncategorized, group_by_month, load_snapshot, normalize_description, read_csv, read_csv_batches, save_snapshot, SQLiteCashFlowTracker
+import asyncio
 import csv
+import json
+import gzip
+import numpy as np
+import pandas as pd
 import os
 import re
+import threading
+import tracemalloc
 
 
 @pytest.fixture
@@ -87,6 +94,17 @@ def test_group_uncategorized(cashflowtracker):
     assert uncategorized["Walmart"][1].value == -100.00
 
 
+def test_normalize_description(cashflowtracker):
+    assert normalize_description("WALMART #123") == normalize_description("Walmart #456") == "walmart"
+    assert normalize_description("Uber *Trip 2024-01-03") == "uber trip"
+    assert normalize_description("AMAZON MKTP 12/03 ORDER 1234567") == "amazon mktp order"
+
+    cashflowtracker.add(Transaction("2024-03-05", "", "WALMART #123", -20.00))
+    uncategorized = group_uncategorized(cashflowtracker)
+    assert list(uncategorized) == ["Salary", "Walmart"]
+    assert [t.description for t in uncategorized["Walmart"]] == ["Walmart", "Walmart", "WALMART #123"]
+
+
 def test_export_data(cashflowtracker):
     filename = "test_export"
     message = export_data(cashflowtracker, filename)
@@ -180,4 +198,681 @@ def test_group_by_month(cashflowtracker):
     assert "March 2024" in grouped
     assert len(grouped["January 2024"]) == 1
     assert len(grouped["February 2024"]) == 3
-    assert len(grouped["March 2024"]) == 1
\ No newline at end of file
+    assert len(grouped["March 2024"]) == 1
+
+def test_tracker_columnar_store(cashflowtracker):
+    assert len(cashflowtracker.transactions) == 5
+    assert cashflowtracker.store.values.dtype.kind == "f"
+    assert cashflowtracker.store.codes.dtype.kind == "i"
+
+    walmart = cashflowtracker.transactions[1]
+    cashflowtracker.categorize(walmart, " groceries ")
+    assert cashflowtracker.transactions[1].category == "Groceries"
+
+    cashflowtracker.edit(walmart, Transaction("2024-02-03", "Groceries", "Walmart", -130.00))
+    assert len(cashflowtracker.transactions) == 5
+    assert cashflowtracker.transactions[-1].value == -130.00
+
+    cashflowtracker.delete(cashflowtracker.transactions[0])
+    assert [t.description for t in cashflowtracker.transactions] == ["Restaurant", "Walmart", "Rent", "Walmart"]
+
+
+def test_summary(cashflowtracker):
+    summary = cashflowtracker.summary()
+
+    assert "From 2024-01-01 to 2024-03-01" in summary
+    assert "(60 days)" in summary
+    assert "| Total Income          | 2500.00" in summary
+    assert "| Total Expense         | -1270.50" in summary
+    assert "| Total Balance         | 1229.50" in summary
+
+
+def test_target_report(cashflowtracker):
+    cashflowtracker.set_target("Rent", 900.00, "monthly")
+    report = cashflowtracker.target_report()
+
+    assert "| January 2024  | Rent       | Budget |   900.00 |     0.00 |       900.00 |" in report
+    assert "| March 2024    | Rent       | Budget |   900.00 |  1000.00 |      -100.00 |" in report
+
+    short_period = cashflowtracker.filter(date_tuple=("2024-02-01", "2024-02-15"))
+    short_period.set_target("Food", 7.00, "daily")
+    report = short_period.target_report()
+
+    assert "| Food       | Budget |    56.00 |    50.00 |         6.00 |" in report
+
+
+def test_filter(cashflowtracker):
+    cashflowtracker.add(Transaction("2024-01-20", "Food", "Market", -30.00))
+
+    february = cashflowtracker.filter(date_tuple=("2024-02-01", "2024-02-29"))
+    assert [t.description for t in february.transactions] == ["Walmart", "Restaurant", "Walmart"]
+
+    january_food = cashflowtracker.filter(date_tuple=("2024-01-01", "2024-01-31"), category="Food")
+    assert [t.description for t in january_food.transactions] == ["Market"]
+
+    income = cashflowtracker.filter(type="income")
+    assert [t.description for t in income.transactions] == ["Salary"]
+
+    assert len(cashflowtracker.filter(date_tuple=("2025-01-01", "2025-12-31")).transactions) == 0
+
+
+def test_date_index(cashflowtracker):
+    store = cashflowtracker.store
+    march = ("2024-03-01", "2024-03-31")
+    assert len(cashflowtracker.filter(date_tuple=march).transactions) == 1
+
+    # Rows appended in date order extend the index instead of dropping it
+    cashflowtracker.add(Transaction("2024-03-10", "Food", "Market", -10.00))
+    cashflowtracker.extend(pd.DataFrame({"Date": [date(2024, 3, 12), date(2024, 3, 20)], "Category": ["Food", "Food"], "Description": ["Cafe", "Cafe"], "Value": [-3.00, -4.00]}))
+    assert store.date_order is not None and store.dates_indexed == 8
+    assert [t.value for t in cashflowtracker.filter(date_tuple=march).transactions] == [-1000.00, -10.00, -3.00, -4.00]
+
+    # An earlier date drops it, and the next range query rebuilds it
+    cashflowtracker.add(Transaction("2024-01-15", "Food", "Market", -5.00))
+    assert store.date_order is None
+    assert [t.value for t in cashflowtracker.filter(date_tuple=("2024-01-01", "2024-01-31")).transactions] == [2500.00, -5.00]
+
+
+def test_category_index(cashflowtracker):
+    assert cashflowtracker.categories() == {"", "Food", "Rent"}
+
+    cashflowtracker.categorize(cashflowtracker.transactions[0], "Salary")
+    assert cashflowtracker.categories() == {"", "Food", "Rent", "Salary"}
+    assert cashflowtracker.set_target("Salary", 2500.00, "monthly") == cashflowtracker.goals
+
+    rent = cashflowtracker.filter(category="Rent").transactions[0]
+    cashflowtracker.delete(rent)
+    assert "Rent" not in cashflowtracker.categories()
+    with pytest.raises(ValueError, match="Category not found. Please enter a valid category."):
+        cashflowtracker.set_target("Rent", 1000.00, "monthly")
+
+    cashflowtracker.add(Transaction("2024-03-05", "Food", "Refund", 20.00))
+    with pytest.raises(ValueError, match="Category has both positive and negative transactions, please review category."):
+        cashflowtracker.set_target("Food", 100.00, "monthly")
+    assert [t.description for t in cashflowtracker.filter(category="Food", type="income").transactions] == ["Refund"]
+
+    # The buckets follow appends and recodes without being rebuilt
+    store = cashflowtracker.store
+    cashflowtracker.filter(type="income").selection()
+    category_index, type_index = store.category_index, store.type_index
+    assert category_index is not None and type_index is not None
+    cashflowtracker.add(Transaction("2024-03-06", "Food", "Market", -8.00))
+    cashflowtracker.categorize(cashflowtracker.transactions[0], "Food")
+    assert store.category_index is category_index and store.type_index is type_index
+    for category in store.categories:
+        expected = np.flatnonzero(store.codes[:store.size] == store.category_codes[category])
+        assert store.category_positions(category).tolist() == expected.tolist()
+    assert store.type_positions("income").tolist() == np.flatnonzero(store.values[:store.size] > 0).tolist()
+
+
+def test_filter_view(cashflowtracker):
+    february = cashflowtracker.filter(date_tuple=("2024-02-01", "2024-02-29"))
+    food = february.filter(type="expense").filter(category="Food")
+    assert food.positions is None
+    assert [t.value for t in food.transactions] == [-50.00]
+    assert food.store is cashflowtracker.store
+
+    cashflowtracker.add(Transaction("2024-02-20", "Food", "Market", -10.00))
+    assert len(food.transactions) == 2
+    assert "| Total Expense         | -60.00" in food.summary()
+
+    food.delete(food.transactions[0])
+    assert food.store is not cashflowtracker.store
+    assert len(food.transactions) == 1
+    assert len(cashflowtracker.transactions) == 6
+
+
+def test_read_csv_batches():
+    csv_path = "temporary_batches_test.csv"
+    create_test_csv(csv_path)
+
+    batches = list(read_csv_batches(csv_path, batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert list(batches[0].columns) == ["Date", "Category", "Description", "Value"]
+    assert batches[0]["Description"].dtype == object
+
+    tracker = CashFlowTracker()
+    tracker.import_csv(csv_path, batch_size=2)
+    assert len(tracker.transactions) == 5
+    assert tracker.transactions[4].category == "Rent"
+    assert tracker.transactions[1].date == datetime.strptime("2024-02-02", "%Y-%m-%d").date()
+
+    os.remove(csv_path)
+
+    tracker = CashFlowTracker()
+    tracker.import_csv("large_sample.csv", batch_size=40)
+    assert len(tracker.transactions) == 90
+    # Descriptions seen in earlier batches keep their codes
+    assert tracker.store.description_names == list(dict.fromkeys(t.description for t in tracker.transactions))
+    assert tracker.transactions[1].date == datetime.strptime("2024-01-07", "%Y-%m-%d").date()
+
+
+def test_date_parser():
+    parser = DateParser("dayfirst", "05/01/2024")
+    parsed = parser.parse(pd.Series(["05/01/2024", "31/12/2023", "05/01/2024", "5/1/2024"]))
+
+    assert [str(d) for d in parsed] == ["2024-01-05", "2023-12-31", "2024-01-05", "2024-01-05"]
+    assert len(parser.cache) == 3
+
+    with pytest.raises(ValueError, match="'date' format should be one of the following"):
+        parser.parse(pd.Series(["not a date"]))
+
+
+def test_invalid_dates_after_sample(tmpdir):
+    # The format is detected from the first 30 rows; later blank or partial dates must still be rejected
+    for name, bad_date in [("blank.csv", ""), ("month.csv", "2024-02"), ("year.csv", "2024")]:
+        path = tmpdir.join(name)
+        rows = [f"2024-01-{day:02d},Food,Market,-1.00" for day in range(1, 31)]
+        path.write("date,category,description,value\n" + "\n".join(rows + [f"{bad_date},Food,Market,-1.00"]) + "\n")
+        with pytest.raises(ValueError, match="'date' format should be one of the following"):
+            CashFlowTracker().import_csv(str(path))
+
+
+def test_import_files(tmpdir):
+    for month, value in [("03", -30.00), ("01", -10.00), ("02", -20.00)]:
+        tmpdir.join(f"statement_{month}.csv").write(f"date,description,value\n2024-{month}-05,Walmart,{value}\n")
+    tmpdir.join("statement_04.csv").write("date,value\n2024-04-05,-40.00\n")
+
+    tracker = CashFlowTracker()
+    errors = tracker.import_files(str(tmpdir), workers=2)
+
+    assert [t.value for t in tracker.transactions] == [-10.00, -20.00, -30.00]
+    assert list(errors) == [str(tmpdir.join("statement_04.csv"))]
+    assert errors[str(tmpdir.join("statement_04.csv"))] == "'description' column not found in CSV file."
+
+    tracker = CashFlowTracker()
+    tracker.import_files(str(tmpdir.join("statement_0[12].csv")), workers=1)
+    assert [t.value for t in tracker.transactions] == [-10.00, -20.00]
+
+    # An empty file is reported like any other bad file, on both paths
+    tmpdir.join("statement_05.csv").write("")
+    for workers in (1, 2):
+        tracker = CashFlowTracker()
+        errors = tracker.import_files(str(tmpdir), workers=workers)
+        assert len(tracker.transactions) == 3
+        assert errors[str(tmpdir.join("statement_05.csv"))] == "CSV file has no header."
+
+
+def test_snapshot(cashflowtracker, tmpdir, monkeypatch):
+    cashflowtracker.set_target("Rent", 900.00, "monthly")
+    monkeypatch.chdir(tmpdir)
+    message = save_snapshot(cashflowtracker, "ledger")
+    assert message == "ledger.cft saved successfully."
+    assert save_snapshot(cashflowtracker, "ledger") == "ledger(1).cft saved successfully."
+
+    loaded = load_snapshot("ledger.cft")
+    assert isinstance(loaded.store.values, np.memmap)
+    assert str(loaded) == str(cashflowtracker)
+    assert loaded.target_report() == cashflowtracker.target_report()
+
+    loaded.categorize(loaded.transactions[0], "Salary")
+    loaded.add(Transaction("2024-03-02", "Food", "Market", -20.00))
+    assert loaded.categories() == {"", "Food", "Rent", "Salary"}
+    assert load_snapshot("ledger.cft").transactions[0].category == ""
+
+
+def test_sqlite_tracker(cashflowtracker, tmpdir):
+    path = str(tmpdir.join("ledger.db"))
+    tracker = SQLiteCashFlowTracker(path)
+    for transaction in cashflowtracker.transactions:
+        tracker.add(transaction)
+    # An id from another ledger does not pick whatever row has it here
+    foreign = Transaction("2024-05-01", "Food", "Cafe", -4.00)
+    foreign.id = tracker.transactions[4].id
+    with pytest.raises(ValueError):
+        tracker.delete(foreign)
+    assert len(tracker.transactions) == 5
+    tracker.categorize(tracker.transactions[0], "salary")
+    tracker.delete(tracker.filter(category="Food").transactions[0])
+    tracker.set_target("Rent", 900.00, "monthly")
+
+    reopened = SQLiteCashFlowTracker(path)
+    assert [t.description for t in reopened.transactions] == ["Salary", "Walmart", "Walmart", "Rent"]
+    assert reopened.categories() == {"", "Salary", "Rent"}
+    assert "| March 2024    | Rent       | Budget |   900.00 |  1000.00 |      -100.00 |" in reopened.target_report()
+
+    february = reopened.filter(date_tuple=("2024-02-01", "2024-02-29"), type="expense")
+    assert len(february.transactions) == 2
+    assert "| Total Expense         | -220.50" in february.summary()
+
+    csv_path = str(tmpdir.join("import.csv"))
+    create_test_csv(csv_path)
+    reopened.import_csv(csv_path)
+    assert len(reopened.transactions) == 9
+    assert reopened.summary() == SQLiteCashFlowTracker(path).summary()
+
+    # Writes to a filtered ledger stay in it, as with an in-memory view
+    rent = reopened.filter(category="Rent")
+    rent.delete(rent.transactions[0])
+    rent.add(Transaction("2024-04-01", "Rent", "Rent", -950.00))
+    assert [t.value for t in rent.transactions] == [-1000.00, -950.00]
+    assert len(SQLiteCashFlowTracker(path).transactions) == 9
+    assert "Rent" in rent.target_report()
+
+
+def test_running_totals(cashflowtracker):
+    cashflowtracker.set_target("Rent", 900.00, "monthly")
+    cashflowtracker.add(Transaction("2024-04-02", "Rent", "Rent", -950.00))
+    cashflowtracker.categorize(cashflowtracker.transactions[1], "Groceries")
+    cashflowtracker.edit(cashflowtracker.transactions[4], Transaction("2024-03-01", "Rent", "Rent", -1100.00))
+    cashflowtracker.delete(cashflowtracker.transactions[0])
+
+    totals = cashflowtracker.store.totals
+    assert totals.income_counts[cashflowtracker.store.category_codes[""]] == 0
+    assert totals.income_totals[cashflowtracker.store.category_codes[""]] == 0.0
+
+    # A view over every row is aggregated from the columns, so both paths must agree
+    everything = cashflowtracker.filter(date_tuple=("2000-01-01", "2100-01-01"))
+    everything.budgets = cashflowtracker.budgets
+    assert cashflowtracker.summary() == everything.summary()
+    assert cashflowtracker.target_report() == everything.target_report()
+
+
+def test_transaction_ids(cashflowtracker):
+    store = cashflowtracker.store
+    salary, old_rent = cashflowtracker.transactions[0], cashflowtracker.transactions[4]
+    rent = Transaction("2024-03-01", "Rent", "Rent", -1100.00)
+    cashflowtracker.edit(old_rent, rent)
+    cashflowtracker.delete(salary)
+
+    # Deletes only tombstone the row, and ids keep pointing at their rows until the store is compacted
+    assert store.dead == 2 and len(cashflowtracker.transactions) == 4
+    assert rent.id == old_rent.id and store.find(rent) == store.size - 1
+    with pytest.raises(ValueError):
+        cashflowtracker.delete(salary)
+    with pytest.raises(ValueError):
+        store.find(old_rent)
+
+    assert [t.description for t in cashflowtracker.transactions] == ["Walmart", "Restaurant", "Walmart", "Rent"]
+    assert store.dead == 0 and store.size == 4
+    assert cashflowtracker.transactions[-1].id == rent.id
+    assert store.find(rent) == 3
+
+    # Ids are local to a store: a transaction from another tracker is found by its values, or not at all
+    other = CashFlowTracker()
+    other.add(Transaction("2024-05-01", "Food", "Cafe", -4.00))
+    other.add(Transaction("2024-05-02", "Food", "Cafe", -6.00))
+    foreign = other.transactions[1]
+    assert foreign.id == cashflowtracker.transactions[0].id
+    with pytest.raises(ValueError):
+        cashflowtracker.delete(foreign)
+    walmart = Transaction("2024-02-02", "", "Walmart", -120.50)
+    walmart.id = 7
+    assert store.find(walmart) == 0
+
+
+def test_category_rules(cashflowtracker, tmpdir):
+    rules = CategoryRules()
+    rules.add(CategoryRule("groceries", "keyword", "WALMART", min_value=-110.00))
+    rules.add(CategoryRule("Shopping", "regex", r"^wal"))
+    rules.add(CategoryRule("Income", "keyword", "salary", min_value=0))
+    assert cashflowtracker.apply_rules(rules) == 3
+    assert [t.category for t in cashflowtracker.transactions] == ["Income", "Shopping", "Food", "Groceries", "Rent"]
+    assert cashflowtracker.apply_rules(rules) == 0
+    assert cashflowtracker.summary() == cashflowtracker.filter(date_tuple=("2000-01-01", "2100-01-01")).summary()
+
+    path = str(tmpdir.join("rules.json"))
+    rules.save(path)
+    assert [str(rule) for rule in CategoryRules.load(path).rules] == [str(rule) for rule in rules.rules]
+    assert CategoryRules.load(str(tmpdir.join("missing.json"))).rules == []
+    with pytest.raises(ValueError):
+        CategoryRule("Food", "regex", "(")
+
+    # Groups stay local to their rule: repeated names and numbered backreferences keep working
+    rules = CategoryRules([
+        CategoryRule("Transport", "regex", r"(?P<brand>uber|lyft)"),
+        CategoryRule("Food", "regex", r"(?P<brand>cafe|bistro)"),
+        CategoryRule("Misc", "regex", r"\b(\w)\1\b"),
+    ])
+    descriptions = np.array(["Uber trip", "Bistro 21", "aa bb", "Rent"], dtype=object)
+    assert rules.match(descriptions, np.full(4, -1.0)).tolist() == [0, 1, 2, -1]
+
+
+def test_interned_descriptions(cashflowtracker):
+    store = cashflowtracker.store
+    assert store.description_codes.dtype == np.int32
+    assert store.description_names == ["Salary", "Walmart", "Restaurant", "Rent"]
+
+    walmart, other_walmart = cashflowtracker.transactions[1], cashflowtracker.transactions[3]
+    assert walmart.description is other_walmart.description
+    cashflowtracker.categorize(walmart, "groceries")
+    cashflowtracker.categorize(other_walmart, "GROCERIES")
+    assert walmart.category is other_walmart.category
+    with pytest.raises(AttributeError):
+        walmart.note = "weekly shop"
+
+    assert store.find(Transaction("2024-02-05", "Food", "Restaurant", -50.00)) == 2
+    store.description_lookup = None
+    with pytest.raises(ValueError):
+        store.find(Transaction("2024-02-05", "Food", "Cafe", -50.00))
+    assert "Cafe" not in store.description_names
+
+
+def test_dataframe_cache(cashflowtracker, tmpdir, monkeypatch):
+    df = cashflowtracker.dataframe()
+    df["Value"] = 0.0
+    # Writes into the returned frame must not reach the cache without pandas Copy-on-Write either
+    df = cashflowtracker.dataframe()
+    df.loc[0, "Value"] = 0.0
+    df.iloc[1, 3] = 0.0
+    cached = cashflowtracker.frames[False]
+    assert cashflowtracker.dataframe()["Value"].tolist() == [2500.00, -120.50, -50.00, -100.00, -1000.00]
+    assert cashflowtracker.frames[False] is cached
+
+    derived = cashflowtracker.dataframe(derived=True)
+    assert derived["Type"].tolist() == ["income", "expense", "expense", "expense", "expense"]
+    assert derived["Month"].dt.month.tolist() == [1, 2, 2, 2, 3]
+
+    cashflowtracker.categorize(cashflowtracker.transactions[1], "Groceries")
+    assert cashflowtracker.dataframe()["Category"].tolist()[1] == "Groceries"
+
+    monkeypatch.chdir(tmpdir)
+    pandas_df = pd.DataFrame({"Value": [1.0]})
+    export_data(pandas_df, "unchanged")
+    assert pandas_df["Value"].tolist() == [1.0]
+
+
+def test_from_dataframe(cashflowtracker):
+    df = cashflowtracker.dataframe()
+    df["Category"] = df["Category"].astype("category")
+    values = df["Value"].to_numpy()
+    copy = CashFlowTracker.from_dataframe(df)
+    assert np.shares_memory(copy.store.values, values)
+    assert copy.summary() == cashflowtracker.summary()
+    assert [str(t) for t in copy.transactions] == [str(t) for t in cashflowtracker.transactions]
+
+    # Borrowed columns are copied before the tracker writes to them
+    copy.categorize(copy.transactions[1], "Groceries")
+    copy.add(Transaction("2024-03-02", "Food", "Cafe", -5.00))
+    assert df["Category"].tolist() == ["", "", "Food", "", "Rent"]
+    assert df["Value"].tolist() == [2500.00, -120.50, -50.00, -100.00, -1000.00]
+
+    # A missing category is uncategorized rather than the last category
+    df = cashflowtracker.dataframe()
+    df["Category"] = pd.Categorical([None, "Food", "Food", None, "Rent"])
+    copy = CashFlowTracker.from_dataframe(df)
+    assert [t.category for t in copy.transactions] == ["", "Food", "Food", "", "Rent"]
+    assert copy.categories() == {"", "Food", "Rent"}
+
+
+def test_arrow_round_trip(cashflowtracker):
+    pytest.importorskip("pyarrow")
+    table = cashflowtracker.filter(type="expense").to_arrow()
+    assert table.num_rows == 4
+    copy = CashFlowTracker.from_arrow(table)
+    assert [str(t) for t in copy.transactions] == [str(t) for t in cashflowtracker.filter(type="expense").transactions]
+
+
+def test_export_formats(cashflowtracker, tmpdir, monkeypatch):
+    monkeypatch.chdir(tmpdir)
+    cashflowtracker.add(Transaction("2024-03-02", "Food", 'Cafe "Central", downtown', -5.00))
+    assert export_data(cashflowtracker, "ledger.csv.gz", "gzip") == "ledger.csv.gz exported successfully."
+    with gzip.open("ledger.csv.gz", "rt", newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[1] == ["2024-01-01", "", "Salary", "2500.00"]
+    assert rows[-1] == ["2024-03-02", "Food", 'Cafe "Central", downtown', "-5.00"]
+
+    # Small chunks produce the same file as a single chunk
+    export_data(cashflowtracker.filter(type="expense"), "expenses", chunk_size=2)
+    export_data(cashflowtracker.filter(type="expense").dataframe(), "expenses_df", chunk_size=2)
+    with open("expenses.csv") as file, open("expenses_df.csv") as df_file:
+        assert file.read() == df_file.read()
+
+    with pytest.raises(ValueError, match="Invalid export format"):
+        export_data(cashflowtracker, "ledger", "xlsx")
+
+
+def test_export_parquet(cashflowtracker, tmpdir, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.chdir(tmpdir)
+    assert export_data(cashflowtracker, "ledger", "parquet") == "ledger.parquet exported successfully."
+    assert pd.read_parquet("ledger.parquet")["Value"].tolist() == [2500.00, -120.50, -50.00, -100.00, -1000.00]
+
+
+def test_export_zstd(cashflowtracker, tmpdir, monkeypatch):
+    zstandard = pytest.importorskip("zstandard")
+    monkeypatch.chdir(tmpdir)
+    assert export_data(cashflowtracker, "ledger", "zstd") == "ledger.csv.zst exported successfully."
+    export_data(cashflowtracker, "plain")
+    with open("ledger.csv.zst", "rb") as file, open("plain.csv", "rb") as plain_file:
+        assert zstandard.ZstdDecompressor().stream_reader(file).read() == plain_file.read()
+
+
+def test_streaming_summary(tmpdir):
+    csv_path = str(tmpdir.join("import.csv"))
+    create_test_csv(csv_path)
+    tracker = CashFlowTracker()
+    tracker.import_csv(csv_path)
+    streamed = CashFlowSummary()
+    streamed.import_csv(csv_path, batch_size=2)
+
+    assert streamed.summary() == tracker.summary()
+    assert streamed.categories() == tracker.categories()
+    tracker.set_target("Food", 100.00, "weekly")
+    streamed.set_target("Food", 100.00, "weekly")
+    assert streamed.target_report() == tracker.target_report()
+
+
+def test_benchmark():
+    from benchmark import BENCHMARKS, compare, parse_rows, run_benchmarks
+
+    assert [parse_rows(rows) for rows in ["10k", "1M", "2500"]] == [10_000, 1_000_000, 2_500]
+    results = run_benchmarks([300], repeat=1)
+    assert list(results["timings"]["300"]) == BENCHMARKS
+
+    faster = {"timings": {"300": {name: seconds / 2 for name, seconds in results["timings"]["300"].items()}}}
+    table, regressions = compare(results, faster)
+    assert len(table) == len(BENCHMARKS)
+    assert [row[1] for row in regressions] == [name for name in BENCHMARKS if results["timings"]["300"][name] > 0]
+    assert compare(results, results)[1] == []
+
+
+def test_instrumentation(cashflowtracker, tmpdir):
+    histogram = HistogramSink()
+    json_lines = JSONLinesSink(str(tmpdir.join("events.jsonl")))
+    instrumentation.add_sink(histogram)
+    instrumentation.add_sink(json_lines)
+    try:
+        cashflowtracker.filter(type="expense").summary()
+        instrumentation.capture_next("cprofile")
+        cashflowtracker.summary()
+        csv_path = str(tmpdir.join("import.csv"))
+        create_test_csv(csv_path)
+        assert len(list(read_csv(csv_path))) == 5
+    finally:
+        instrumentation.remove_sink(histogram)
+        instrumentation.remove_sink(json_lines)
+        json_lines.close()
+
+    assert histogram.operations["summary"]["count"] == 2
+    assert histogram.operations["summary"]["rows"] == 9
+    assert "summary" in str(histogram)
+    assert instrumentation.captured.total_calls > 0 and instrumentation.capture is None
+    with open(str(tmpdir.join("events.jsonl"))) as file:
+        events = [json.loads(line) for line in file]
+    assert [event["operation"] for event in events] == ["filter", "summary", "summary", "read_csv"]
+    assert (events[0]["rows_scanned"], events[0]["rows_returned"]) == (5, 4)
+    with pytest.raises(ValueError):
+        instrumentation.capture_next("perf")
+
+    # A capture requested before a generator goes to that generator, and tracing started by the host keeps running
+    tracemalloc.start()
+    try:
+        instrumentation.capture_next("tracemalloc")
+        rows = read_csv(csv_path)
+        assert instrumentation.capture is None
+        assert len(list(rows)) == 5
+        assert isinstance(instrumentation.captured, tracemalloc.Snapshot)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_sharded_tracker(cashflowtracker, tmpdir):
+    csv_path = str(tmpdir.join("import.csv"))
+    create_test_csv(csv_path)
+    by_account = ShardedCashFlowTracker("account", workers=2)
+    for transaction in cashflowtracker.transactions[:3]:
+        by_account.add(transaction, "checking")
+    for transaction in cashflowtracker.transactions[3:]:
+        by_account.add(transaction, "savings")
+    by_account.import_csv(csv_path, "credit card")
+    with pytest.raises(ValueError):
+        by_account.add(Transaction("2024-01-01", "", "Salary", 1.00))
+
+    combined = CashFlowTracker()
+    for transaction in cashflowtracker.transactions:
+        combined.add(transaction)
+    combined.import_csv(csv_path)
+    for tracker in (by_account, combined):
+        tracker.set_target("Rent", 900.00, "monthly")
+        tracker.set_target("Food", 60.00, "weekly")
+    assert sorted(by_account.shards) == ["checking", "credit card", "savings"]
+    assert by_account.summary() == combined.summary()
+    assert by_account.target_report() == combined.target_report()
+    assert by_account.filter(type="expense").summary() == combined.filter(type="expense").summary()
+
+    by_year = ShardedCashFlowTracker("year", processes=True)
+    by_year.extend(combined.dataframe())
+    by_year.extend(pd.DataFrame({"Date": [date(2023, 12, 31)], "Category": ["Food"], "Description": ["Cafe"], "Value": [-5.00]}))
+    assert sorted(by_year.shards) == [2023, 2024]
+    combined.add(Transaction("2023-12-31", "Food", "Cafe", -5.00))
+    assert by_year.summary() == combined.summary()
+
+
+def test_service(cashflowtracker, tmpdir):
+    from service import CashFlowService
+
+    async def request(port, method, path, body=None):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        content = json.dumps(body).encode() if body is not None else b""
+        writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\nContent-Length: {len(content)}\r\n\r\n".encode() + content)
+        response = await reader.read()
+        writer.close()
+        head, _, payload = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(payload)
+
+    async def scenario():
+        service = CashFlowService(cashflowtracker, port=0)
+        await service.start()
+        try:
+            port = service.port
+            status, body = await request(port, "POST", "/transactions", {"date": "2024-03-05", "category": "food", "description": "Cafe", "value": -8.5})
+            assert (status, body["category"]) == (201, "Food")
+
+            csv_path = str(tmpdir.join("import.csv"))
+            create_test_csv(csv_path)
+            assert await request(port, "POST", "/import", {"path": csv_path}) == (200, {"imported": 5})
+            assert (await request(port, "POST", "/targets", {"category": "Rent", "amount": 900, "period": "monthly"}))[0] == 201
+
+            # Concurrent readers all see the same published snapshot
+            responses = await asyncio.gather(*[request(port, "GET", "/summary") for _ in range(5)])
+            assert all(response == responses[0] for response in responses)
+            assert responses[0][1]["summary"] == cashflowtracker.summary()
+            status, body = await request(port, "GET", "/target_report?start=2024-02-01&end=2024-03-31")
+            assert status == 200 and "Rent" in body["target_report"]
+            status, body = await request(port, "GET", "/transactions?category=Food&limit=1")
+            assert body["count"] == 3 and len(body["transactions"]) == 1
+
+            assert (await request(port, "POST", "/targets", {"category": "Missing", "amount": 1, "period": "monthly"}))[0] == 400
+            assert (await request(port, "GET", "/nowhere"))[0] == 404
+            assert (await request(port, "DELETE", "/summary"))[0] == 405
+            assert (await request(port, "GET", "/transactions?offset=-1"))[0] == 400
+            status, body = await request(port, "GET", "/transactions?offset=8&limit=5")
+            assert status == 200 and [t["id"] for t in body["transactions"]] == [8, 9, 10]
+
+            # Files that cannot be read are client errors; unexpected failures still get a response
+            assert (await request(port, "POST", "/import", {"path": str(tmpdir)}))[0] == 400
+            empty_path = str(tmpdir.join("empty.csv"))
+            open(empty_path, "w").close()
+            assert (await request(port, "POST", "/import", {"path": empty_path}))[0] == 400
+            service.current.summary = lambda: 1 / 0
+            status, body = await request(port, "GET", "/summary")
+            assert status == 500 and body["error"].startswith("ZeroDivisionError")
+        finally:
+            await service.stop()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_tracker(cashflowtracker):
+    # Snapshots share the columns until the live tracker rewrites a row
+    snapshot = cashflowtracker.snapshot()
+    assert np.shares_memory(snapshot.store.values, cashflowtracker.store.values)
+    summary = snapshot.summary()
+    walmart = cashflowtracker.transactions[1]
+    cashflowtracker.categorize(walmart, "Groceries")
+    cashflowtracker.delete(cashflowtracker.transactions[0])
+    assert not np.shares_memory(snapshot.store.values, cashflowtracker.store.values)
+    assert snapshot.summary() == summary and len(snapshot.transactions) == 5
+    assert "Groceries" not in snapshot.categories()
+
+    # The description list and the running totals are shared too, and each side copies them before its first change
+    snapshot = cashflowtracker.snapshot()
+    assert snapshot.store.description_names is cashflowtracker.store.description_names
+    assert snapshot.store.totals.days is cashflowtracker.store.totals.days
+    names = list(cashflowtracker.store.descriptions())
+    cashflowtracker.add(Transaction(date(2024, 3, 1), "Food", "Bakery", -4.0))
+    assert snapshot.store.descriptions() == names and "Bakery" not in snapshot.dataframe()["Description"].tolist()
+    snapshot.add(Transaction(date(2024, 3, 2), "Food", "Butcher", -9.0))
+    assert snapshot.store.descriptions() == names + ["Butcher"]
+    assert cashflowtracker.store.descriptions() == names + ["Bakery"]
+    assert snapshot.store.totals.days is not cashflowtracker.store.totals.days
+
+    tracker = ConcurrentCashFlowTracker(batch_size=50)
+    tracker.add(Transaction(date(2024, 1, 1), "Rent", "Rent", -1000.0))
+    tracker.set_target("Rent", 1000.0, "monthly")
+    with pytest.raises(ValueError):
+        tracker.set_target("Rent", 1000.0, "hourly")
+    tracker.flush()
+    errors = []
+    done = threading.Event()
+
+    def ingest():
+        for day in range(1, 29):
+            for _ in range(50):
+                tracker.add(Transaction(date(2024, 2, day), "Food", "Market", -2.0))
+        tracker.flush()
+        done.set()
+
+    def report():
+        try:
+            while not done.is_set():
+                snapshot = tracker.snapshot()
+                # Every published snapshot holds whole batches of 50 rows
+                assert len(snapshot.transactions) % 50 == 1
+                snapshot.summary()
+                snapshot.target_report()
+                len(tracker.filter(category="Food").transactions)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=ingest)] + [threading.Thread(target=report) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(tracker.transactions) == 1 + 28 * 50
+    assert tracker.published.store.totals.expense_totals == [-1000.0, -2800.0]
+    with tracker.read() as live:
+        assert live.summary() == tracker.summary()
+
+    # Edits wait in the queue too, and a whole batch of them publishes a single snapshot
+    published = tracker.snapshot()
+    market = tracker.transactions[1]
+    tracker.categorize(market, "Groceries")
+    tracker.delete(tracker.transactions[2])
+    tracker.edit(tracker.transactions[3], Transaction(date(2024, 2, 1), "Food", "Market", -3.0))
+    assert tracker.snapshot() is published
+    tracker.flush()
+    assert tracker.snapshot() is not published and "Groceries" not in published.categories()
+    assert len(tracker.transactions) == 28 * 50 and "Groceries" in tracker.categories()
+    assert tracker.published.store.totals.expense_totals == [-1000.0, -2797.0, -2.0]
+
+    # A change that fails does not hold back the rest of its batch
+    tracker.delete(Transaction(date(2024, 3, 1), "Food", "Market", -2.0))
+    tracker.categorize(tracker.transactions[2], "Groceries")
+    with pytest.raises(ValueError):
+        tracker.flush()
+    assert tracker.published.store.totals.expense_counts == [1, 1397, 2]